@@ -45,7 +45,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.info("Starting SMART data load task...")
             result = await smart_manager.load_data()
             if result:
-                _LOGGER.info("SMART data loaded successfully: %d records", len(smart_manager._data))
+                _LOGGER.info("SMART data loaded successfully: %d records", smart_manager.get_record_count())
             else:
                 _LOGGER.error("SMART data load returned False")
         except Exception as exc:
@@ -42,6 +42,8 @@ class OpenRailDataConnectedBinarySensor(BinarySensorEntity):
 
     @callback
     def _handle_update(self, _is_connected: bool) -> None:
+        if self.hass is None or self.platform is None:
+            return  # Not added to Home Assistant yet
         self.async_write_ha_state()
 
     @property
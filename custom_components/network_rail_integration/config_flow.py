@@ -24,6 +24,7 @@ from .const import (
     CONF_TD_MAX_BATCH_SIZE,
     CONF_TD_MAX_MESSAGES_PER_SECOND,
     CONF_TD_UPDATE_INTERVAL,
+    CONF_TD_UPDATE_JITTER,
     CONF_TOC_FILTER,
     CONF_TOPIC,
     CONF_USERNAME,
@@ -39,11 +40,13 @@ from .const import (
     CONF_TRACK_SECTION_ALERT_SERVICES,
     CONF_ENABLE_DEBUG_SENSOR,
     CONF_ENABLE_TD_RAW_JSON,
+    CONF_ENABLE_MOVEMENT_RAW,
     DEFAULT_TOPIC,
     DEFAULT_TD_EVENT_HISTORY_SIZE,
     DEFAULT_TD_MAX_BATCH_SIZE,
     DEFAULT_TD_MAX_MESSAGES_PER_SECOND,
     DEFAULT_TD_UPDATE_INTERVAL,
+    DEFAULT_TD_UPDATE_JITTER,
     DOMAIN,
 )
 from .stanox_utils import search_stanox, get_formatted_station_name_async
@@ -413,6 +416,7 @@ class NetworkRailOptionsFlowHandler(config_entries.OptionsFlow):
             
             # Store rate limiting settings
             opts[CONF_TD_UPDATE_INTERVAL] = user_input.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
+            opts[CONF_TD_UPDATE_JITTER] = user_input.get(CONF_TD_UPDATE_JITTER, DEFAULT_TD_UPDATE_JITTER)
             opts[CONF_TD_MAX_BATCH_SIZE] = user_input.get(CONF_TD_MAX_BATCH_SIZE, DEFAULT_TD_MAX_BATCH_SIZE)
             opts[CONF_TD_MAX_MESSAGES_PER_SECOND] = user_input.get(CONF_TD_MAX_MESSAGES_PER_SECOND, DEFAULT_TD_MAX_MESSAGES_PER_SECOND)
             
@@ -459,6 +463,18 @@ class NetworkRailOptionsFlowHandler(config_entries.OptionsFlow):
                         mode=selector.NumberSelectorMode.BOX,
                     ),
                 ),
+                vol.Optional(
+                    CONF_TD_UPDATE_JITTER,
+                    default=opts.get(CONF_TD_UPDATE_JITTER, DEFAULT_TD_UPDATE_JITTER)
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=30,
+                        step=1,
+                        unit_of_measurement="seconds",
+                        mode=selector.NumberSelectorMode.BOX,
+                    ),
+                ),
                 vol.Optional(
                     CONF_TD_MAX_BATCH_SIZE,
                     default=opts.get(CONF_TD_MAX_BATCH_SIZE, DEFAULT_TD_MAX_BATCH_SIZE)
@@ -1231,6 +1247,7 @@ class NetworkRailOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             opts = self.config_entry.options.copy()
             opts[CONF_ENABLE_DEBUG_SENSOR] = user_input.get(CONF_ENABLE_DEBUG_SENSOR, True)
+            opts[CONF_ENABLE_MOVEMENT_RAW] = user_input.get(CONF_ENABLE_MOVEMENT_RAW, False)
             
             self.hass.config_entries.async_update_entry(
                 self.config_entry, options=opts
@@ -1245,6 +1262,10 @@ class NetworkRailOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_ENABLE_DEBUG_SENSOR,
                     default=opts.get(CONF_ENABLE_DEBUG_SENSOR, True)
                 ): bool,
+                vol.Optional(
+                    CONF_ENABLE_MOVEMENT_RAW,
+                    default=opts.get(CONF_ENABLE_MOVEMENT_RAW, False)
+                ): bool,
             }
         )
         return self.async_show_form(
@@ -1253,6 +1274,8 @@ class NetworkRailOptionsFlowHandler(config_entries.OptionsFlow):
             description_placeholders={
                 "description": "Configure advanced integration settings.\n\n"
                               "**Enable Debug Log Sensor**: Creates a sensor showing recent debug logs in the UI (default: enabled).\n\n"
-                              "Note: Disabling this sensor will reduce entity count but debug logs will still appear in Home Assistant logs."
+                              "Note: Disabling this sensor will reduce entity count but debug logs will still appear in Home Assistant logs.\n\n"
+                              "**Enable Raw Movement Attribute**: Adds the raw message body to movement sensor attributes (default: disabled). "
+                              "The body's fields are already included individually, so this mainly helps debugging."
             }
         )
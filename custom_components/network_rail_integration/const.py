@@ -15,6 +15,7 @@ CONF_TD_AREAS = "td_areas"  # List of TD area IDs to track
 CONF_TD_EVENT_HISTORY_SIZE = "td_event_history_size"  # Number of events to keep per area
 CONF_ENABLE_DEBUG_SENSOR = "enable_debug_sensor"  # Enable Debug Log Sensor
 CONF_ENABLE_TD_RAW_JSON = "enable_td_raw_json"  # Enable Train Describer Raw JSON Sensor
+CONF_ENABLE_MOVEMENT_RAW = "enable_movement_raw"  # Include raw movement body in sensor attributes
 CONF_DIAGRAM_CONFIGS = "diagram_configs"  # List of diagram configurations
 # Deprecated constants (kept for migration)
 CONF_DIAGRAM_ENABLED = "diagram_enabled"
@@ -34,14 +35,17 @@ CONF_ENABLE_VSTP = "enable_vstp"  # Enable VSTP feed
 
 # Train Describer rate limiting configuration
 CONF_TD_UPDATE_INTERVAL = "td_update_interval"  # Minimum seconds between sensor updates
+CONF_TD_UPDATE_JITTER = "td_update_jitter"  # Max random delay added to throttled sensor updates
 CONF_TD_MAX_BATCH_SIZE = "td_max_batch_size"  # Maximum messages to batch before dispatch
 CONF_TD_MAX_MESSAGES_PER_SECOND = "td_max_messages_per_second"  # Rate limit threshold
 
 # Default Train Describer settings
 DEFAULT_TD_EVENT_HISTORY_SIZE = 10
 DEFAULT_TD_UPDATE_INTERVAL = 3  # Seconds between sensor updates
+DEFAULT_TD_UPDATE_JITTER = 1  # Seconds of spread between sensors' throttled updates
 DEFAULT_TD_MAX_BATCH_SIZE = 50  # Messages per batch
 DEFAULT_TD_MAX_MESSAGES_PER_SECOND = 20  # Messages per second limit
+MOVEMENT_WRITE_DELAY = 0.1  # Seconds to coalesce movement sensor state writes
 
 DEFAULT_TOPIC = "TRAIN_MVT_ALL_TOC"
 DEFAULT_TD_TOPIC = "TD_ALL_SIG_AREA"
@@ -51,11 +55,15 @@ NR_HOST = "publicdatafeeds.networkrail.co.uk"
 NR_PORT = 61618
 
 SMART_DATA_URL = "https://publicdatafeeds.networkrail.co.uk/ntrod/SupportingFileAuthenticate?type=SMART"
-SMART_CACHE_FILE = "smart_data.json"
+SMART_CACHE_FILE = "smart_data.json.gz"
+SMART_LEGACY_CACHE_FILE = "smart_data.json"  # JSON wrapper format used before the gzip cache
+SMART_ETAG_FILE = "smart_data.etag"  # ETag of the cached payload, for conditional refreshes
 SMART_CACHE_EXPIRY_DAYS = 30
+SMART_READ_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when downloading SMART data
 
 DISPATCH_MOVEMENT = f"{DOMAIN}_movement"
 DISPATCH_CONNECTED = f"{DOMAIN}_connected"
 DISPATCH_TD = f"{DOMAIN}_td"  # Train Describer messages
 DISPATCH_VSTP = f"{DOMAIN}_vstp"  # VSTP schedule messages
 DISPATCH_TRACK_SECTION = f"{DOMAIN}_track_section"  # Track section events
+DISPATCH_SMART_LOADED = f"{DOMAIN}_smart_loaded"  # SMART data loaded or refreshed
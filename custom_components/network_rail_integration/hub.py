@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import threading
 import time
@@ -12,6 +11,7 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util.json import json_loads
 
 from .const import (
     CONF_ENABLE_TD,
@@ -211,7 +211,7 @@ class OpenRailDataHub:
             def on_message(self, frame):  # noqa: N802
                 body = getattr(frame, "body", "")
                 try:
-                    payload = json.loads(body)
+                    payload = json_loads(body)
                 except Exception:
                     _LOGGER.debug("Non-JSON message received (ignored)")
                     return
@@ -483,11 +483,8 @@ class OpenRailDataHub:
                 self._hub.state.last_movement_per_station.update(station_movements)
                 self._hub.state.last_batch_count = kept
                 self._hub.state.last_seen_monotonic = time.monotonic()
-                # Dispatch general movement event
+                # Single movement event; station sensors check their own STANOX
                 async_dispatcher_send(self._hass, DISPATCH_MOVEMENT)
-                # Dispatch per-station movement events
-                for stanox in station_movements:
-                    async_dispatcher_send(self._hass, f"{DISPATCH_MOVEMENT}_{stanox}")
 
             @callback
             def _update_td_message(self, parsed_message: dict[str, Any]) -> None:
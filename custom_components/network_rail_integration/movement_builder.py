@@ -0,0 +1,110 @@
+"""Attribute builder for Train Movements messages."""
+
+from __future__ import annotations
+
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Final
+
+from homeassistant.util import dt as dt_util
+
+from .stanox_utils import get_station_name
+from .toc_codes import get_direction_description, get_line_description, get_toc_name
+
+# Movement fields copied verbatim into the sensor attributes
+HEADER_PASSTHROUGH: Final[tuple[str, ...]] = (
+    "msg_type",
+    "source_dev_id",
+    "original_data_source",
+    "msg_queue_timestamp",
+)
+BODY_PASSTHROUGH: Final[tuple[str, ...]] = (
+    "train_id",
+    "toc_id",
+    "event_type",
+    "planned_timestamp",
+    "actual_timestamp",
+    "timetable_variation",
+    "variation_status",
+    "loc_stanox",
+    "platform",
+    "line_ind",
+    "direction_ind",
+    "corr_id",
+    "event_source",
+    "train_terminated",
+    "offroute_ind",
+)
+_PASSTHROUGH_KEYS: Final[tuple[str, ...]] = HEADER_PASSTHROUGH + BODY_PASSTHROUGH
+
+
+def ms_to_local_iso(ms: Any) -> str | None:
+    """Convert a millisecond epoch timestamp to a local ISO 8601 string.
+
+    Args:
+        ms: Milliseconds since the epoch (int or numeric string)
+
+    Returns:
+        Local ISO timestamp, or None if the value is not numeric
+    """
+    if type(ms) is int:
+        ms_i = ms
+    else:
+        try:
+            ms_i = int(ms)
+        except (TypeError, ValueError):
+            return None
+    return _ms_to_local_iso_cached(ms_i, dt_util.DEFAULT_TIME_ZONE)
+
+
+@lru_cache(maxsize=4096)
+def _ms_to_local_iso_cached(ms_i: int, time_zone: tzinfo) -> str:
+    """Format a millisecond epoch in the given local time zone.
+
+    The time zone is part of the cache key so a change to the Home
+    Assistant time zone doesn't return stale strings.
+    """
+    return datetime.fromtimestamp(ms_i / 1000.0, tz=time_zone).isoformat()
+
+
+def build_movement_attributes(
+    header: dict[str, Any],
+    body: dict[str, Any],
+    extra_attrs: dict[str, Any] | None = None,
+    include_raw: bool = False,
+) -> dict[str, Any]:
+    """Build common movement attributes from header and body data.
+
+    Args:
+        header: The message header
+        body: The message body
+        extra_attrs: Optional extra attributes to include (e.g., station_name, batch_count_seen)
+        include_raw: Whether to include the unmodified body under "raw"
+
+    Returns:
+        Dictionary of attributes
+    """
+    attrs: dict[str, Any] = dict(
+        zip(
+            _PASSTHROUGH_KEYS,
+            chain(map(header.get, HEADER_PASSTHROUGH), map(body.get, BODY_PASSTHROUGH)),
+        )
+    )
+
+    # Decoded values reuse the raw values already copied above
+    attrs["msg_queue_time_local"] = ms_to_local_iso(attrs["msg_queue_timestamp"])
+    attrs["toc_name"] = get_toc_name(attrs["toc_id"])
+    attrs["planned_time_local"] = ms_to_local_iso(attrs["planned_timestamp"])
+    attrs["actual_time_local"] = ms_to_local_iso(attrs["actual_timestamp"])
+    attrs["location_name"] = get_station_name(attrs["loc_stanox"])
+    attrs["line_description"] = get_line_description(attrs["line_ind"])
+    attrs["direction_description"] = get_direction_description(attrs["direction_ind"])
+    if include_raw:
+        attrs["raw"] = body
+
+    # Add any extra attributes
+    if extra_attrs:
+        attrs.update(extra_attrs)
+
+    return attrs
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+from collections import deque
 import logging
+import random
 import time
 from typing import Any
 
@@ -17,22 +19,38 @@ from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN, 
+    DISPATCH_CONNECTED,
     DISPATCH_MOVEMENT, 
+    DISPATCH_SMART_LOADED,
     DISPATCH_TD,
+    DISPATCH_VSTP,
     CONF_STATIONS, 
     CONF_STANOX_FILTER,
     CONF_ENABLE_TD,
     CONF_TD_AREAS,
     CONF_TD_EVENT_HISTORY_SIZE,
     CONF_TD_UPDATE_INTERVAL,
+    CONF_TD_UPDATE_JITTER,
     CONF_DIAGRAM_CONFIGS,
+    CONF_TRACK_SECTIONS,
     CONF_ENABLE_DEBUG_SENSOR,
     CONF_ENABLE_TD_RAW_JSON,
+    CONF_ENABLE_MOVEMENT_RAW,
     DEFAULT_TD_EVENT_HISTORY_SIZE,
     DEFAULT_TD_UPDATE_INTERVAL,
+    DEFAULT_TD_UPDATE_JITTER,
+    MOVEMENT_WRITE_DELAY,
 )
-from .toc_codes import get_toc_name, get_direction_description, get_line_description
-from .stanox_utils import get_station_name, get_formatted_station_name, load_stanox_data
+from .movement_builder import build_movement_attributes, ms_to_local_iso
+from .service_classifier import classify_service, should_alert_for_service
+from .smart_utils import (
+    get_berth_to_platform_mapping,
+    get_berths_for_stanox,
+    get_sequential_berths,
+    get_station_berths_with_connections,
+)
+from .stanox_utils import get_formatted_station_name, load_stanox_data
+from .toc_codes import get_toc_name
 from .td_area_codes import format_td_area_title, get_td_area_name
 from .debug_log import DebugLogSensor
 
@@ -51,9 +69,7 @@ async def async_setup_entry(
     # Preload STANOX data to avoid blocking I/O later
     await load_stanox_data()
 
-    _LOGGER.info("=== async_setup_entry called for sensors ===")
-    _LOGGER.info("Entry ID: %s", entry.entry_id)
-    _LOGGER.info("Entry options: %s", entry.options)
+    _LOGGER.debug("Setting up sensors for entry %s", entry.entry_id)
     
     hub = hass.data[DOMAIN][entry.entry_id]
     
@@ -64,15 +80,18 @@ async def async_setup_entry(
     stations = options.get(CONF_STATIONS, [])
     stanox_filter = (options.get(CONF_STANOX_FILTER) or "").strip()
     
+    station_stanoxes: set[str] = set()
+    
     # Create sensor for each configured station
     for station in stations:
         stanox = station.get("stanox", "")
         name = station.get("name", "Unknown")
         if stanox:
+            station_stanoxes.add(stanox)
             entities.append(OpenRailDataStationSensor(hass, entry, hub, stanox, name))
     
     # Backward compatibility: if old stanox_filter is set, create a sensor for it
-    if stanox_filter and not any(s.get("stanox") == stanox_filter for s in stations):
+    if stanox_filter and stanox_filter not in station_stanoxes:
         entities.append(OpenRailDataStationSensor(hass, entry, hub, stanox_filter, f"Station {stanox_filter}"))
     
     # Always add the global last movement sensor for backward compatibility
@@ -80,18 +99,18 @@ async def async_setup_entry(
     
     # Add Train Describer sensors if enabled
     if options.get(CONF_ENABLE_TD, False):
+        td_areas = options.get(CONF_TD_AREAS, [])
+        
         # Initialize event history size in berth state
         event_history_size = options.get(CONF_TD_EVENT_HISTORY_SIZE, DEFAULT_TD_EVENT_HISTORY_SIZE)
         hub.state.berth_state.set_event_history_size(event_history_size)
         
         # Initialize platform mappings if SMART data is available
         smart_manager = hass.data[DOMAIN].get(f"{entry.entry_id}_smart_manager")
-        if smart_manager and smart_manager.is_available():
-            from .smart_utils import get_berth_to_platform_mapping
+        if td_areas and smart_manager and smart_manager.is_available():
             graph = smart_manager.get_graph()
             
             # Build berth-to-platform mapping for configured TD areas
-            td_areas = options.get(CONF_TD_AREAS, [])
             berth_platform_mapping = {}
             
             for area_id in td_areas:
@@ -110,7 +129,6 @@ async def async_setup_entry(
             entities.append(TrainDescriberRawJsonSensor(hass, entry, hub))
         
         # Create sensors for specific TD areas if configured
-        td_areas = options.get(CONF_TD_AREAS, [])
         for area_id in td_areas:
             entities.append(TrainDescriberAreaSensor(hass, entry, hub, area_id))
     
@@ -119,17 +137,21 @@ async def async_setup_entry(
     smart_manager = hass.data[DOMAIN].get(f"{entry.entry_id}_smart_manager")
     vstp_manager = hass.data[DOMAIN].get(f"{entry.entry_id}_vstp_manager")
     
-    _LOGGER.info("Setting up Network Diagram sensors: %d diagrams configured", len(diagram_configs))
-    
-    if smart_manager:
-        _LOGGER.info("Smart manager found: is_available=%s", smart_manager.is_available())
+    if not diagram_configs:
+        _LOGGER.debug("No Network Diagram sensors configured")
+    elif smart_manager:
+        _LOGGER.debug(
+            "Setting up %d Network Diagram sensors (SMART data available=%s)",
+            len(diagram_configs),
+            smart_manager.is_available(),
+        )
         for diagram_cfg in diagram_configs:
             enabled = diagram_cfg.get("enabled", False)
             diagram_stanox = diagram_cfg.get("stanox")
             diagram_range = diagram_cfg.get("range", 1)
             alert_services = diagram_cfg.get("alert_services", {})
             
-            _LOGGER.info(
+            _LOGGER.debug(
                 "Processing diagram config: stanox=%s, enabled=%s, range=%d, alerts=%s",
                 diagram_stanox,
                 enabled,
@@ -138,7 +160,7 @@ async def async_setup_entry(
             )
             
             if enabled and diagram_stanox:
-                _LOGGER.info("Creating NetworkDiagramSensor for stanox=%s", diagram_stanox)
+                _LOGGER.debug("Creating NetworkDiagramSensor for stanox=%s", diagram_stanox)
                 entities.append(NetworkDiagramSensor(
                     hass, entry, hub, smart_manager, diagram_stanox, diagram_range,
                     vstp_manager=vstp_manager,
@@ -150,7 +172,6 @@ async def async_setup_entry(
         _LOGGER.warning("Smart manager not found, skipping Network Diagram sensors")
     
     # Add Track Section sensors for each configured section
-    from .const import CONF_TRACK_SECTIONS
     track_sections = options.get(CONF_TRACK_SECTIONS, [])
     if track_sections:
         for section in track_sections:
@@ -186,72 +207,124 @@ def _should_throttle_update(last_update_time: float, throttle_seconds: float) ->
     return elapsed < throttle_seconds
 
 
-def _ms_to_local_iso(ms: Any) -> str | None:
-    try:
-        ms_i = int(ms)
-    except Exception:
-        return None
-    dt_utc = datetime.fromtimestamp(ms_i / 1000.0, tz=timezone.utc)
-    dt_local = dt_util.as_local(dt_utc)
-    return dt_local.isoformat()
+# Most recent berths kept in a tracked train's berths_visited
+_MAX_BERTHS_VISITED = 64
+
+# Cached VSTP classifications kept per sensor before the cache is reset
+_VSTP_CACHE_MAX = 1024
 
 
-def _build_movement_attributes(header: dict[str, Any], body: dict[str, Any], extra_attrs: dict[str, Any] | None = None) -> dict[str, Any]:
-    """Build common movement attributes from header and body data.
+def _classify_vstp_service(
+    cache: dict[str, tuple[dict[str, Any], dict[str, Any], tuple[str | None, str | None]]],
+    vstp_manager,
+    vstp_data: dict[str, Any],
+    headcode: str,
+) -> tuple[dict[str, Any], tuple[str | None, str | None]]:
+    """Classify a VSTP schedule and look up its origin and destination.
+    
+    Results are reused while the VSTP manager returns the same schedule object
+    for the headcode, so a train re-entering an area isn't classified again.
     
-    Args:
-        header: The message header
-        body: The message body
-        extra_attrs: Optional extra attributes to include (e.g., station_name, batch_count_seen)
-        
     Returns:
-        Dictionary of attributes
+        Tuple of (service classification, (origin, destination))
     """
-    # Get raw values for decoding
-    toc_id = body.get("toc_id")
-    direction_ind = body.get("direction_ind")
-    line_ind = body.get("line_ind")
-    loc_stanox = body.get("loc_stanox")
-    platform = body.get("platform")
-
-    attrs: dict[str, Any] = {
-        "msg_type": header.get("msg_type"),
-        "source_dev_id": header.get("source_dev_id"),
-        "original_data_source": header.get("original_data_source"),
-        "msg_queue_timestamp": header.get("msg_queue_timestamp"),
-        "msg_queue_time_local": _ms_to_local_iso(header.get("msg_queue_timestamp")),
-        "train_id": body.get("train_id"),
-        "toc_id": toc_id,
-        "toc_name": get_toc_name(toc_id),
-        "event_type": body.get("event_type"),
-        "planned_timestamp": body.get("planned_timestamp"),
-        "planned_time_local": _ms_to_local_iso(body.get("planned_timestamp")),
-        "actual_timestamp": body.get("actual_timestamp"),
-        "actual_time_local": _ms_to_local_iso(body.get("actual_timestamp")),
-        "timetable_variation": body.get("timetable_variation"),
-        "variation_status": body.get("variation_status"),
-        "loc_stanox": loc_stanox,
-        "location_name": get_station_name(loc_stanox),
-        "platform": platform,
-        "line_ind": line_ind,
-        "line_description": get_line_description(line_ind),
-        "direction_ind": direction_ind,
-        "direction_description": get_direction_description(direction_ind),
-        "corr_id": body.get("corr_id"),
-        "event_source": body.get("event_source"),
-        "train_terminated": body.get("train_terminated"),
-        "offroute_ind": body.get("offroute_ind"),
-        "raw": body,
-    }
+    cached = cache.get(headcode)
+    if cached is not None and cached[0] is vstp_data:
+        return cached[1], cached[2]
+    
+    classification = classify_service(vstp_data, headcode)
+    endpoints = vstp_manager.get_origin_destination(vstp_data)
+    if len(cache) >= _VSTP_CACHE_MAX:
+        cache.clear()
+    cache[headcode] = (vstp_data, classification, endpoints)
+    return classification, endpoints
+
+
+class _TrackedTrain:
+    """A train being tracked within a track section."""
     
-    # Add any extra attributes
-    if extra_attrs:
-        attrs.update(extra_attrs)
+    __slots__ = (
+        "headcode",
+        "current_berth",
+        "entered_at",
+        "entered_at_monotonic",
+        "berths_visited",
+        "td_message",
+        "vstp_data",
+        "service_type",
+        "service_category",
+        "description",
+        "origin",
+        "destination",
+        "is_freight",
+        "is_passenger",
+        "is_special",
+        "special_types",
+        "static_attrs",
+        "triggers_alert",
+        "alert_reason",
+    )
     
-    return attrs
+    def __init__(self, headcode: str, berth: str, td_message: dict[str, Any]) -> None:
+        """Initialize a newly entered train."""
+        self.headcode = headcode
+        self.current_berth = berth
+        self.entered_at = dt_util.now().isoformat()
+        self.entered_at_monotonic = time.monotonic()
+        self.berths_visited: deque[str] = deque((berth,), maxlen=_MAX_BERTHS_VISITED)
+        self.td_message = td_message
+        self.vstp_data: dict[str, Any] | None = None
+        self.service_type: str | None = None
+        self.service_category: str | None = None
+        self.description: str | None = None
+        self.origin: str | None = None
+        self.destination: str | None = None
+        self.is_freight = False
+        self.is_passenger = False
+        self.is_special = False
+        self.special_types: list[str] = []
+        self.static_attrs: dict[str, Any] | None = None
+        self.triggers_alert = False
+        self.alert_reason: str | None = None
+
+
+def _movement_state(mv: dict[str, Any] | None) -> str | None:
+    """Get the sensor state shown for a movement message."""
+    if not mv:
+        return None
+    body = mv.get("body") or {}
+    return str(body.get("event_type") or body.get("movement_type") or "movement")
+
+
+class _CoalescedWriteSensorMixin:
+    """Coalesces bursts of movement updates into a single state write.
+    
+    The sensor records the latest movement as soon as it is dispatched and
+    calls ``_schedule_write``; one write then follows after a short delay,
+    covering every update that arrived in the meantime.
+    """
+
+    _write_handle: asyncio.TimerHandle | None = None  # Pending coalesced write
+
+    def _schedule_write(self) -> None:
+        """Schedule a state write unless one is already pending."""
+        if self._write_handle is None:
+            self._write_handle = self.hass.loop.call_later(MOVEMENT_WRITE_DELAY, self._flush_write)
+
+    @callback
+    def _flush_write(self) -> None:
+        """Write the latest movement state to Home Assistant."""
+        self._write_handle = None
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending write when the sensor is removed."""
+        if self._write_handle:
+            self._write_handle.cancel()
+            self._write_handle = None
 
 
-class OpenRailDataLastMovementSensor(SensorEntity):
+class OpenRailDataLastMovementSensor(_CoalescedWriteSensorMixin, SensorEntity):
     """Shows the last movement message seen (after optional filtering)."""
 
     _attr_has_entity_name = True
@@ -262,58 +335,61 @@ class OpenRailDataLastMovementSensor(SensorEntity):
         self.hass = hass
         self.entry = entry
         self.hub = hub
-        self._unsub = None
-
-    async def async_added_to_hass(self) -> None:
-        self._unsub = async_dispatcher_connect(self.hass, DISPATCH_MOVEMENT, self._handle_update)
-
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
-
-    @callback
-    def _handle_update(self) -> None:
-        self.async_write_ha_state()
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self.entry.entry_id}_last_movement"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.entry.entry_id)},
+        # Movement shown by this sensor, refreshed when the hub dispatches
+        self._current_mv: dict[str, Any] | None = hub.state.last_movement
+        self._include_raw = entry.options.get(CONF_ENABLE_MOVEMENT_RAW, False)
+        self._attr_native_value = _movement_state(self._current_mv)
+        self._attrs_cache: dict[str, Any] | None = None
+        self._attrs_cache_key: tuple[Any, ...] | None = None
+        self._attr_unique_id = f"{entry.entry_id}_last_movement"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
             name="Network Rail Integration",
             manufacturer="Network Rail",
             model="Train Movements Feed",
         )
 
-    @property
-    def native_value(self) -> str | None:
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(self.hass, DISPATCH_MOVEMENT, self._handle_update))
+
+    @callback
+    def _handle_update(self) -> None:
+        # Skip the write if the movement shown hasn't changed
         mv = self.hub.state.last_movement
-        if not mv:
-            return None
-        body = mv.get("body") or {}
-        return str(body.get("event_type") or body.get("movement_type") or "movement")
+        if mv is self._current_mv:
+            return
+        self._current_mv = mv
+        self._attr_native_value = _movement_state(mv)
+        if self.hass is None or self.platform is None:
+            return  # Not added to Home Assistant yet
+        self._schedule_write()
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        mv = self.hub.state.last_movement
+        mv = self._current_mv
         if not mv:
             return {}
+        
+        # Rebuild only when a different movement (or batch) is shown
+        batch_count = self.hub.state.last_batch_count
+        key = self._attrs_cache_key
+        if key is not None and key[0] is mv and key[1] == batch_count:
+            return self._attrs_cache
+        
         header = mv.get("header") or {}
         body = mv.get("body") or {}
 
-        return _build_movement_attributes(
+        self._attrs_cache = build_movement_attributes(
             header, 
             body, 
-            extra_attrs={"batch_count_seen": self.hub.state.last_batch_count}
+            extra_attrs={"batch_count_seen": batch_count},
+            include_raw=self._include_raw,
         )
+        self._attrs_cache_key = (mv, batch_count)
+        return self._attrs_cache
 
 
-class OpenRailDataStationSensor(SensorEntity):
+class OpenRailDataStationSensor(_CoalescedWriteSensorMixin, SensorEntity):
     """Shows the last movement for a specific station."""
 
     _attr_has_entity_name = True
@@ -328,111 +404,151 @@ class OpenRailDataStationSensor(SensorEntity):
         # Use formatted station name if available, otherwise use the provided name
         formatted_name = get_formatted_station_name(stanox)
         self._attr_name = formatted_name if formatted_name else station_name
-        self._unsub = None
-
-    async def async_added_to_hass(self) -> None:
-        # Subscribe to station-specific dispatcher signal
-        self._unsub = async_dispatcher_connect(
-            self.hass, 
-            f"{DISPATCH_MOVEMENT}_{self._stanox}", 
-            self._handle_update
-        )
-
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
-
-    @callback
-    def _handle_update(self) -> None:
-        self.async_write_ha_state()
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self.entry.entry_id}_station_{self._stanox}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.entry.entry_id)},
+        self._attr_unique_id = f"{entry.entry_id}_station_{stanox}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
             name="Network Rail Integration",
             manufacturer="Network Rail",
             model="Train Movements Feed",
         )
+        # Movement shown by this sensor, refreshed when the hub dispatches
+        self._current_mv: dict[str, Any] | None = hub.state.last_movement_per_station.get(stanox)
+        self._include_raw = entry.options.get(CONF_ENABLE_MOVEMENT_RAW, False)
+        self._attr_native_value = _movement_state(self._current_mv)
+        self._attrs_cache: dict[str, Any] | None = None
+        self._attrs_source: dict[str, Any] | None = None
 
-    @property
-    def native_value(self) -> str | None:
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(self.hass, DISPATCH_MOVEMENT, self._handle_update))
+
+    @callback
+    def _handle_update(self) -> None:
+        # Only write when this station's movement changed in the batch
         mv = self.hub.state.last_movement_per_station.get(self._stanox)
-        if not mv:
-            return None
-        body = mv.get("body") or {}
-        return str(body.get("event_type") or body.get("movement_type") or "movement")
+        if mv is self._current_mv:
+            return
+        self._current_mv = mv
+        self._attr_native_value = _movement_state(mv)
+        if self.hass is None or self.platform is None:
+            return  # Not added to Home Assistant yet
+        self._schedule_write()
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        mv = self.hub.state.last_movement_per_station.get(self._stanox)
+        mv = self._current_mv
         if not mv:
             return {"stanox": self._stanox, "station_name": self._station_name}
+        
+        # Rebuild only when a different movement is shown
+        if mv is self._attrs_source:
+            return self._attrs_cache
+        
         header = mv.get("header") or {}
         body = mv.get("body") or {}
 
-        return _build_movement_attributes(
+        self._attrs_cache = build_movement_attributes(
             header, 
             body, 
             extra_attrs={
                 "stanox": self._stanox,
                 "station_name": self._station_name
-            }
+            },
+            include_raw=self._include_raw,
         )
+        self._attrs_source = mv
+        return self._attrs_cache
 
 
-class TrainDescriberStatusSensor(SensorEntity):
-    """Sensor showing Train Describer feed status."""
-
-    _attr_has_entity_name = True
-    _attr_name = "Train Describer Status"
-    _attr_icon = "mdi:train-car-passenger-door"
+class _ThrottledDispatchSensorMixin:
+    """Dispatcher subscription and write throttling shared by the TD sensors.
+    
+    Subclasses call ``_init_dispatch`` from ``__init__`` and override
+    ``_apply_message`` to record what they need from each message. State is
+    written at most once per update interval; a message arriving inside the
+    window schedules a single trailing write so the latest state is published.
+    Trailing writes are offset by a per-entity random phase so that sensors
+    fed by the same dispatch don't all write at the same instant.
+    Subclasses may also override ``_state_fingerprint`` so that writes which
+    would not change anything visible are skipped.
+    """
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, hub) -> None:
-        self.hass = hass
-        self.entry = entry
-        self.hub = hub
-        self._unsub = None
+    def _init_dispatch(self, entry: ConfigEntry, signal: str) -> None:
+        self._signal = signal
+        # Options changes reload the entry, so the interval can be read once
+        self._throttle_seconds = entry.options.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
+        jitter = entry.options.get(CONF_TD_UPDATE_JITTER, DEFAULT_TD_UPDATE_JITTER)
+        self._throttle_phase = random.uniform(0, min(jitter, self._throttle_seconds))
         self._last_update_time = 0.0  # Track last update for throttling
+        self._flush_handle: asyncio.TimerHandle | None = None  # Pending throttled write
+        self._last_state_key: Any = None  # Fingerprint of the last written state
 
     async def async_added_to_hass(self) -> None:
-        self._unsub = async_dispatcher_connect(self.hass, DISPATCH_TD, self._handle_update)
+        self.async_on_remove(async_dispatcher_connect(self.hass, self._signal, self._handle_update))
 
     async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _apply_message(self, parsed_message: dict[str, Any]) -> None:
+        """Record state from a dispatched message (no-op by default)."""
+
+    def _state_fingerprint(self) -> Any:
+        """Return a value identifying the state to be written, or None to always write."""
+        return None
 
     @callback
     def _handle_update(self, parsed_message: dict[str, Any]) -> None:
-        # Apply throttling based on configuration
-        throttle_seconds = self.entry.options.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
+        # Always keep the latest message; it supersedes any update still queued
+        self._apply_message(parsed_message)
         
-        if _should_throttle_update(self._last_update_time, throttle_seconds):
-            return  # Skip this update due to throttling
+        if self.hass is None or self.platform is None:
+            return  # Not added to Home Assistant yet
+        
+        if self._flush_handle is not None:
+            return  # A write is already scheduled and will publish this message
+        
+        if _should_throttle_update(self._last_update_time, self._throttle_seconds):
+            # Defer a single write to the end of the throttle window instead of dropping it
+            remaining = self._throttle_seconds - (time.monotonic() - self._last_update_time)
+            self._flush_handle = self.hass.loop.call_later(remaining + self._throttle_phase, self._flush)
+            return
+        
+        self._flush()
+
+    @callback
+    def _flush(self) -> None:
+        """Write the most recent state to Home Assistant."""
+        self._flush_handle = None
+        
+        fingerprint = self._state_fingerprint()
+        if fingerprint is not None and fingerprint == self._last_state_key:
+            return  # Nothing visible has changed since the last write
+        self._last_state_key = fingerprint
         
         self._last_update_time = time.monotonic()
         self.async_write_ha_state()
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self.entry.entry_id}_td_status"
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.entry.entry_id)},
+class TrainDescriberStatusSensor(_ThrottledDispatchSensorMixin, SensorEntity):
+    """Sensor showing Train Describer feed status."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Train Describer Status"
+    _attr_icon = "mdi:train-car-passenger-door"
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, hub) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.hub = hub
+        self._attr_unique_id = f"{entry.entry_id}_td_status"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
             name="Network Rail Integration",
             manufacturer="Network Rail",
             model="Train Describer Feed",
         )
+        self._init_dispatch(entry, DISPATCH_TD)
 
     @property
     def native_value(self) -> str | None:
@@ -450,7 +566,7 @@ class TrainDescriberStatusSensor(SensorEntity):
         # Format timestamp as HH:MM:SS
         time_str = ""
         if time_ms:
-            time_iso = _ms_to_local_iso(time_ms)
+            time_iso = ms_to_local_iso(time_ms)
             if time_iso:
                 try:
                     # Extract time portion from ISO format more safely
@@ -509,16 +625,16 @@ class TrainDescriberStatusSensor(SensorEntity):
         if not msg:
             return {
                 "message_count": self.hub.state.td_message_count,
-                "berth_count": len(self.hub.state.berth_state.get_all_berths()),
+                "berth_count": self.hub.state.berth_state.berth_count,
             }
         
         attrs = {
             "msg_type": msg.get("msg_type"),
             "area_id": msg.get("area_id"),
             "time": msg.get("time"),
-            "time_local": _ms_to_local_iso(msg.get("time")),
+            "time_local": ms_to_local_iso(msg.get("time")),
             "message_count": self.hub.state.td_message_count,
-            "berth_count": len(self.hub.state.berth_state.get_all_berths()),
+            "berth_count": self.hub.state.berth_state.berth_count,
         }
         
         # Add type-specific attributes
@@ -552,7 +668,7 @@ class TrainDescriberStatusSensor(SensorEntity):
         return attrs
 
 
-class TrainDescriberAreaSensor(SensorEntity):
+class TrainDescriberAreaSensor(_ThrottledDispatchSensorMixin, SensorEntity):
     """Sensor showing Train Describer data for a specific area."""
 
     _attr_has_entity_name = True
@@ -565,50 +681,22 @@ class TrainDescriberAreaSensor(SensorEntity):
         self._area_id = area_id
         # Use formatted TD area name with full descriptive title
         self._attr_name = format_td_area_title(area_id)
-        self._unsub = None
-        self._last_message: dict[str, Any] | None = None
-        self._last_update_time = 0.0  # Track last update for throttling
-
-    async def async_added_to_hass(self) -> None:
-        # Subscribe to area-specific dispatcher signal
-        self._unsub = async_dispatcher_connect(
-            self.hass, 
-            f"{DISPATCH_TD}_{self._area_id}", 
-            self._handle_update
-        )
-
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
-
-    @callback
-    def _handle_update(self, parsed_message: dict[str, Any]) -> None:
-        # Apply throttling based on configuration
-        throttle_seconds = self.entry.options.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
-        
-        if _should_throttle_update(self._last_update_time, throttle_seconds):
-            # Still update the internal message but don't trigger HA state update
-            self._last_message = parsed_message
-            return
-        
-        self._last_message = parsed_message
-        self._last_update_time = time.monotonic()
-        self.async_write_ha_state()
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self.entry.entry_id}_td_area_{self._area_id}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.entry.entry_id)},
+        self._attr_unique_id = f"{entry.entry_id}_td_area_{area_id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
             name="Network Rail Integration",
             manufacturer="Network Rail",
             model="Train Describer Feed",
         )
+        # Subscribe to area-specific dispatcher signal
+        self._init_dispatch(entry, f"{DISPATCH_TD}_{area_id}")
+        self._last_message: dict[str, Any] | None = None
+        # Attributes are rebuilt only when the message, berth state or SMART data change
+        self._attrs_cache: dict[str, Any] | None = None
+        self._attrs_cache_key: tuple[Any, ...] | None = None
+
+    def _apply_message(self, parsed_message: dict[str, Any]) -> None:
+        self._last_message = parsed_message
 
     @property
     def native_value(self) -> str | None:
@@ -619,16 +707,36 @@ class TrainDescriberAreaSensor(SensorEntity):
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
+        smart_manager = self.hass.data.get(DOMAIN, {}).get(f"{self.entry.entry_id}_smart_manager")
+        message = self._last_message
+        version = self.hub.state.berth_state.version
+        smart_updated = smart_manager.get_last_updated() if smart_manager else None
+        
+        # The key holds the message itself, so identity is checked against a
+        # live object rather than an id() that could be reused
+        key = self._attrs_cache_key
+        if (
+            self._attrs_cache is None
+            or key is None
+            or key[0] is not message
+            or key[1] != version
+            or key[2] != smart_updated
+        ):
+            self._attrs_cache = self._build_attributes(smart_manager)
+            self._attrs_cache_key = (message, version, smart_updated)
+        return self._attrs_cache
+
+    def _build_attributes(self, smart_manager) -> dict[str, Any]:
+        """Build the attribute dict from current berth state and SMART data."""
         area_berths = self.hub.state.berth_state.get_area_berths(self._area_id)
         
         # Get platform states (all platforms, no filtering)
         platform_states = self.hub.state.berth_state.get_all_platform_states()
         
         # Get event history (all events, no filtering)
-        event_history = self.hub.state.berth_state.get_event_history()
+        event_history = self.hub.state.berth_state.get_formatted_event_history()
         
         # Get SMART data for station information if available
-        smart_manager = self.hass.data.get(DOMAIN, {}).get(f"{self.entry.entry_id}_smart_manager")
         station_name = None
         station_code = None
         stations_in_area = []
@@ -636,27 +744,18 @@ class TrainDescriberAreaSensor(SensorEntity):
         if smart_manager and smart_manager.is_available():
             # Try to find stations in this TD area from SMART data
             graph = smart_manager.get_graph()
-            stanox_to_berths = graph.get("stanox_to_berths", {})
             
-            # Find all unique stations in this TD area
-            # Note: For large datasets, consider caching or indexing by TD area
-            found_stations = set()
-            for stanox, berth_records in stanox_to_berths.items():
-                for record in berth_records:
-                    if record.get("td_area") == self._area_id:
-                        stanme = record.get("stanme", "").strip()
-                        if stanme and stanox and stanox.strip():
-                            found_stations.add((stanox, stanme))
+            # Unique (stanox, stanme) pairs for this TD area, sorted by STANOX at SMART load
+            found_stations = graph.get("td_area_to_stations", {}).get(self._area_id, [])
             
             if found_stations:
-                # Sort by STANOX and use the first station
-                sorted_stations = sorted(found_stations)
-                station_code, station_name = sorted_stations[0]
+                # Use the first station (lowest STANOX)
+                station_code, station_name = found_stations[0]
                 
                 # Store all stations for reference
                 stations_in_area = [
                     {"stanox": stanox, "name": name} 
-                    for stanox, name in sorted_stations
+                    for stanox, name in found_stations
                 ]
         
         # Fallback to TD area name if no SMART data or no stations found
@@ -668,7 +767,7 @@ class TrainDescriberAreaSensor(SensorEntity):
             "area_id": self._area_id,
             "station_name": station_name,
             "station_code": station_code,
-            "berth_count": len(area_berths),
+            "berth_count": self.hub.state.berth_state.area_berth_count(self._area_id),
             "occupied_berths": {},
         }
         
@@ -685,40 +784,14 @@ class TrainDescriberAreaSensor(SensorEntity):
                     "platform_id": state.get("platform_id"),
                     "current_train": state.get("current_train"),
                     "current_event": state.get("current_event"),
-                    "last_updated": _ms_to_local_iso(last_updated) if last_updated else None,
+                    "last_updated": ms_to_local_iso(last_updated) if last_updated else None,
                     "status": state.get("status", "idle"),
                 }
             attrs["platforms"] = platforms_dict
         
-        # Add recent events
+        # Add recent events (formatted by BerthState when each event was recorded)
         if event_history:
-            recent_events = []
-            for event in event_history:
-                timestamp = event.get("timestamp")
-                event_dict = {
-                    "event_type": event.get("event_type"),
-                    "train_id": event.get("train_id"),
-                    "timestamp": _ms_to_local_iso(timestamp) if timestamp else None,
-                    "area_id": event.get("area_id"),
-                }
-                
-                # Add platform information
-                if "platform" in event:
-                    event_dict["platform"] = event["platform"]
-                if "from_platform" in event:
-                    event_dict["from_platform"] = event["from_platform"]
-                if "to_platform" in event:
-                    event_dict["to_platform"] = event["to_platform"]
-                
-                # Add berth information
-                if "from_berth" in event:
-                    event_dict["from_berth"] = event["from_berth"]
-                if "to_berth" in event:
-                    event_dict["to_berth"] = event["to_berth"]
-                
-                recent_events.append(event_dict)
-            
-            attrs["recent_events"] = recent_events
+            attrs["recent_events"] = event_history
         
         # Add event history size
         attrs["event_history_size"] = self.hub.state.berth_state.get_event_history_size()
@@ -731,7 +804,7 @@ class TrainDescriberAreaSensor(SensorEntity):
             attrs.update({
                 "last_msg_type": self._last_message.get("msg_type"),
                 "last_time": self._last_message.get("time"),
-                "last_time_local": _ms_to_local_iso(self._last_message.get("time")),
+                "last_time_local": ms_to_local_iso(self._last_message.get("time")),
             })
             
             # Add type-specific attributes
@@ -756,7 +829,7 @@ class TrainDescriberAreaSensor(SensorEntity):
         return attrs
 
 
-class TrainDescriberRawJsonSensor(SensorEntity):
+class TrainDescriberRawJsonSensor(_ThrottledDispatchSensorMixin, SensorEntity):
     """Sensor showing raw JSON from Train Describer feed."""
 
     _attr_has_entity_name = True
@@ -767,41 +840,14 @@ class TrainDescriberRawJsonSensor(SensorEntity):
         self.hass = hass
         self.entry = entry
         self.hub = hub
-        self._unsub = None
-        self._last_update_time = 0.0  # Track last update for throttling
-
-    async def async_added_to_hass(self) -> None:
-        self._unsub = async_dispatcher_connect(self.hass, DISPATCH_TD, self._handle_update)
-
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
-
-    @callback
-    def _handle_update(self, parsed_message: dict[str, Any]) -> None:
-        # Apply throttling based on configuration
-        throttle_seconds = self.entry.options.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
-        
-        if _should_throttle_update(self._last_update_time, throttle_seconds):
-            return  # Skip this update due to throttling
-        
-        self._last_update_time = time.monotonic()
-        self.async_write_ha_state()
-
-    @property
-    def unique_id(self) -> str:
-        return f"{self.entry.entry_id}_td_raw_json"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.entry.entry_id)},
+        self._attr_unique_id = f"{entry.entry_id}_td_raw_json"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
             name="Network Rail Integration",
             manufacturer="Network Rail",
             model="Train Describer Feed",
         )
+        self._init_dispatch(entry, DISPATCH_TD)
 
     @property
     def native_value(self) -> str | None:
@@ -828,11 +874,11 @@ class TrainDescriberRawJsonSensor(SensorEntity):
             "msg_type": msg.get("msg_type"),
             "area_id": msg.get("area_id"),
             "time": msg.get("time"),
-            "time_local": _ms_to_local_iso(msg.get("time")),
+            "time_local": ms_to_local_iso(msg.get("time")),
         }
 
 
-class NetworkDiagramSensor(SensorEntity):
+class NetworkDiagramSensor(_ThrottledDispatchSensorMixin, SensorEntity):
     """Sensor showing network diagram with berth occupancy."""
 
     _attr_has_entity_name = True
@@ -860,6 +906,15 @@ class NetworkDiagramSensor(SensorEntity):
         
         # Train tracking (merged from TrackSectionSensor)
         self._trains_in_diagram: dict[str, dict[str, Any]] = {}
+        self._vstp_cache: dict[str, tuple[dict[str, Any], dict[str, Any], tuple[str | None, str | None]]] = {}
+        
+        # Diagram berth sets, cached against the SMART data timestamp
+        self._berths_cache: tuple[Any, frozenset[tuple[str, str]], frozenset[str]] | None = None
+        self._watched_berths_cache: tuple[Any, frozenset[tuple[str, str]]] | None = None
+        self._layout_cache: tuple[Any, dict[str, Any]] | None = None
+        
+        # Availability is refreshed on connection and SMART load signals
+        self._attr_available = smart_manager.is_available() and hub.is_connected
         
         # Use formatted station name if available, otherwise use STANOX code
         formatted_name = get_formatted_station_name(center_stanox)
@@ -867,9 +922,7 @@ class NetworkDiagramSensor(SensorEntity):
             self._attr_name = f"Network Diagram for {formatted_name} ({center_stanox})"
         else:
             self._attr_name = f"Network Diagram {center_stanox}"
-        self._unsub = None
-        self._unsub_vstp = None
-        self._last_update_time = 0.0  # Track last update for throttling
+        self._init_dispatch(entry, DISPATCH_TD)
         
         _LOGGER.info(
             "NetworkDiagramSensor created: stanox=%s, name=%s, range=%d, alerts_enabled=%s",
@@ -882,42 +935,46 @@ class NetworkDiagramSensor(SensorEntity):
     async def async_added_to_hass(self) -> None:
         _LOGGER.info("NetworkDiagramSensor async_added_to_hass: stanox=%s", self._center_stanox)
         # Subscribe to TD messages for berth updates
-        self._unsub = async_dispatcher_connect(self.hass, DISPATCH_TD, self._handle_td_message)
+        await super().async_added_to_hass()
         _LOGGER.info("NetworkDiagramSensor subscribed to TD updates: stanox=%s", self._center_stanox)
         
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, DISPATCH_CONNECTED, self._handle_availability_update)
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, DISPATCH_SMART_LOADED, self._handle_availability_update)
+        )
+        # SMART data may have finished loading before the entity was added
+        self._attr_available = self.smart_manager.is_available() and self.hub.is_connected
+        
         # Subscribe to VSTP events if manager is available
-        from .const import DISPATCH_VSTP
         if self.vstp_manager:
-            self._unsub_vstp = async_dispatcher_connect(
-                self.hass, DISPATCH_VSTP, self._handle_vstp_message
+            self.async_on_remove(
+                async_dispatcher_connect(self.hass, DISPATCH_VSTP, self._handle_vstp_message)
             )
 
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
-        if self._unsub_vstp:
-            self._unsub_vstp()
-            self._unsub_vstp = None
-
-    @callback
-    def _handle_td_message(self, parsed_message: dict[str, Any]) -> None:
-        """Handle TD message update with throttling and train tracking."""
-        _LOGGER.debug("NetworkDiagramSensor _handle_td_message called: stanox=%s", self._center_stanox)
-        
-        # Track trains if alert services are enabled
+    def _apply_message(self, parsed_message: dict[str, Any]) -> None:
+        """Track trains from every TD message, including throttled ones."""
         if self._alert_services:
             self._process_train_tracking(parsed_message)
+
+    def _state_fingerprint(self) -> Any:
+        """Summarise what the diagram shows so unchanged states are not rewritten."""
+        if not self.smart_manager.is_available():
+            return None
         
-        # Apply throttling based on configuration
-        throttle_seconds = self.entry.options.get(CONF_TD_UPDATE_INTERVAL, DEFAULT_TD_UPDATE_INTERVAL)
-        
-        if _should_throttle_update(self._last_update_time, throttle_seconds):
-            return  # Skip this update due to throttling
-        
-        self._last_update_time = time.monotonic()
-        _LOGGER.debug("NetworkDiagramSensor triggering state update: stanox=%s", self._center_stanox)
-        self.async_write_ha_state()
+        graph = self.smart_manager.get_graph()
+        get_berth = self.hub.state.berth_state.get_berth
+        occupied = frozenset(
+            (td_area, berth_id, berth_data.get("description"))
+            for td_area, berth_id in self._get_watched_berths(graph)
+            if (berth_data := get_berth(td_area, berth_id))
+        )
+        trains = tuple(
+            (headcode, train_data.get("current_berth"))
+            for headcode, train_data in self._trains_in_diagram.items()
+        )
+        return (self.smart_manager.get_last_updated(), occupied, trains)
     
     @callback
     def _handle_vstp_message(self, vstp_message: dict[str, Any]) -> None:
@@ -946,22 +1003,21 @@ class NetworkDiagramSensor(SensorEntity):
             if not headcode:
                 return
             
-            from_berth_key = f"{area_id}:{from_berth}" if from_berth else None
-            to_berth_key = f"{area_id}:{to_berth}" if to_berth else None
-            
             # Check if train is entering, leaving, or moving within diagram area
-            from_in_diagram = from_berth_key in diagram_berths if from_berth_key else False
-            to_in_diagram = to_berth_key in diagram_berths if to_berth_key else False
+            from_in_diagram = bool(from_berth) and (area_id, from_berth) in diagram_berths
+            to_in_diagram = bool(to_berth) and (area_id, to_berth) in diagram_berths
             
             if to_in_diagram and not from_in_diagram:
                 # Train entering diagram area
-                self._train_entered_diagram(to_berth_key, headcode, td_message)
+                self._train_entered_diagram(f"{area_id}:{to_berth}", headcode, td_message)
             elif from_in_diagram and not to_in_diagram:
                 # Train leaving diagram area
                 self._train_left_diagram(headcode)
             elif from_in_diagram and to_in_diagram:
                 # Train moving within diagram area
-                self._train_moved_in_diagram(from_berth_key, to_berth_key, headcode, td_message)
+                self._train_moved_in_diagram(
+                    f"{area_id}:{from_berth}", f"{area_id}:{to_berth}", headcode, td_message
+                )
         
         # Handle berth cancel (CB) - train disappeared from berth
         elif msg_type == "CB":
@@ -969,8 +1025,7 @@ class NetworkDiagramSensor(SensorEntity):
             headcode = td_message.get("descr")
             
             if headcode and from_berth:
-                from_berth_key = f"{area_id}:{from_berth}"
-                if from_berth_key in diagram_berths:
+                if (area_id, from_berth) in diagram_berths:
                     # Train cancelled in diagram area - remove it
                     self._train_left_diagram(headcode)
         
@@ -980,10 +1035,9 @@ class NetworkDiagramSensor(SensorEntity):
             headcode = td_message.get("descr")
             
             if headcode and to_berth:
-                to_berth_key = f"{area_id}:{to_berth}"
-                if to_berth_key in diagram_berths:
+                if (area_id, to_berth) in diagram_berths:
                     # Train interposed in diagram area
-                    self._train_entered_diagram(to_berth_key, headcode, td_message)
+                    self._train_entered_diagram(f"{area_id}:{to_berth}", headcode, td_message)
     
     def _train_entered_diagram(self, berth: str, headcode: str, td_message: dict[str, Any]) -> None:
         """Handle train entering the diagram area."""
@@ -992,27 +1046,28 @@ class NetworkDiagramSensor(SensorEntity):
         # Get VSTP data if available
         vstp_data = None
         service_classification = None
+        origin = destination = None
         if self.vstp_manager:
             vstp_data = self.vstp_manager.get_schedule_for_headcode(headcode)
             
             if vstp_data:
-                # Classify the service
-                from .service_classifier import classify_service
-                service_classification = classify_service(vstp_data, headcode)
+                # Classify the service (reused while the schedule is unchanged)
+                service_classification, (origin, destination) = _classify_vstp_service(
+                    self._vstp_cache, self.vstp_manager, vstp_data, headcode
+                )
         
         # Create train data
         train_data = {
             "headcode": headcode,
             "current_berth": berth,
             "entered_at": now.isoformat(),
-            "berths_visited": [berth],
+            "_entered_at_monotonic": time.monotonic(),
+            "berths_visited": deque((berth,), maxlen=_MAX_BERTHS_VISITED),
             "td_message": td_message,
         }
         
         # Add VSTP enrichment if available
         if vstp_data and service_classification:
-            origin, destination = self.vstp_manager.get_origin_destination(vstp_data) if self.vstp_manager else (None, None)
-            
             train_data.update({
                 "vstp_data": vstp_data,
                 "service_type": service_classification.get("service_type"),
@@ -1028,12 +1083,10 @@ class NetworkDiagramSensor(SensorEntity):
             
             # Get operator info
             if vstp_data:
-                from .toc_codes import get_toc_name
                 toc_id = vstp_data.get("CIF_train_uid", "")[:2] if vstp_data.get("CIF_train_uid") else ""
                 train_data["operator"] = get_toc_name(toc_id)
             
             # Check if this should trigger an alert
-            from .service_classifier import should_alert_for_service
             should_alert, alert_reason = should_alert_for_service(service_classification, self._alert_services)
             train_data["triggers_alert"] = should_alert
             train_data["alert_reason"] = alert_reason
@@ -1061,7 +1114,9 @@ class NetworkDiagramSensor(SensorEntity):
         if headcode in self._trains_in_diagram:
             train_data = self._trains_in_diagram[headcode]
             train_data["current_berth"] = to_berth
-            train_data["berths_visited"].append(to_berth)
+            berths_visited = train_data["berths_visited"]
+            if berths_visited[-1] != to_berth:
+                berths_visited.append(to_berth)
             train_data["td_message"] = td_message
         else:
             # Train wasn't tracked - add it now
@@ -1069,17 +1124,7 @@ class NetworkDiagramSensor(SensorEntity):
     
     def _calculate_time_in_diagram(self, train_data: dict[str, Any]) -> int:
         """Calculate how long train has been in diagram area (seconds)."""
-        entered_at_str = train_data.get("entered_at")
-        if not entered_at_str:
-            return 0
-        
-        try:
-            entered_at = datetime.fromisoformat(entered_at_str)
-            now = dt_util.now()
-            delta = now - entered_at
-            return int(delta.total_seconds())
-        except Exception:
-            return 0
+        return int(time.monotonic() - train_data["_entered_at_monotonic"])
     
     def _fire_diagram_alert(self, headcode: str, train_data: dict[str, Any], alert_reason: str) -> None:
         """Fire a Home Assistant event for diagram alert."""
@@ -1113,25 +1158,21 @@ class NetworkDiagramSensor(SensorEntity):
             model="Network Diagram",
         )
 
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        smart_available = self.smart_manager.is_available()
-        hub_connected = self.hub.is_connected
-        
-        _LOGGER.debug(
-            "NetworkDiagramSensor availability check: smart_manager.is_available()=%s, hub.is_connected=%s",
-            smart_available,
-            hub_connected
-        )
-        
-        return smart_available and hub_connected
+    @callback
+    def _handle_availability_update(self, *args: Any) -> None:
+        """Refresh availability after a connection change or SMART data load."""
+        available = self.smart_manager.is_available() and self.hub.is_connected
+        if available == self._attr_available:
+            return
+        self._attr_available = available
+        if self.hass is None or self.platform is None:
+            return
+        self.async_write_ha_state()
 
     @property
     def native_value(self) -> int:
         """Return the count of currently occupied berths in the diagram area."""
         if not self.smart_manager.is_available():
-            _LOGGER.debug("NetworkDiagramSensor native_value: SMART manager not available")
             return 0
         
         # Get all berths in the diagram area
@@ -1139,100 +1180,139 @@ class NetworkDiagramSensor(SensorEntity):
         berth_state = self.hub.state.berth_state
         
         # Get berths for center station and adjacent stations
-        all_berths = self._get_all_diagram_berths(graph)
-        
-        _LOGGER.debug(
-            "NetworkDiagramSensor native_value: Found %d berths in diagram area for STANOX %s",
-            len(all_berths),
-            self._center_stanox
-        )
+        berth_keys = self._get_all_diagram_berth_keys(graph)
         
         # Count occupied berths
-        occupied_count = 0
-        for berth_key in all_berths:
-            parts = berth_key.split(":", 1)
-            if len(parts) == 2:
-                td_area, berth_id = parts
-                berth_data = berth_state.get_berth(td_area, berth_id)
-                if berth_data:
-                    occupied_count += 1
-        
-        _LOGGER.debug("NetworkDiagramSensor native_value: %d occupied berths", occupied_count)
-        return occupied_count
+        return len(berth_state.occupied_keys() & berth_keys)
 
-    def _get_all_diagram_berths(self, graph: dict[str, Any]) -> set[str]:
-        """Get all berth keys in the diagram area."""
-        from .smart_utils import get_berths_for_stanox
+    def _get_watched_berths(self, graph: dict[str, Any]) -> frozenset[tuple[str, str]]:
+        """Get every (td_area, berth_id) whose occupancy appears in the diagram attributes."""
+        if not graph:
+            return frozenset()
         
-        all_berths = set()
+        last_updated = self.smart_manager.get_last_updated()
+        if self._watched_berths_cache and self._watched_berths_cache[0] == last_updated:
+            return self._watched_berths_cache[1]
         
-        # Get berths for center station
-        center_berths = get_berths_for_stanox(graph, self._center_stanox)
-        for berth_info in center_berths:
-            td_area = berth_info.get("td_area", "")
-            from_berth = berth_info.get("from_berth", "")
-            to_berth = berth_info.get("to_berth", "")
-            if from_berth and td_area:
-                all_berths.add(f"{td_area}:{from_berth}")
-            if to_berth and td_area:
-                all_berths.add(f"{td_area}:{to_berth}")
+        layout = self._get_diagram_layout(graph)
+        watched = list(self._get_all_diagram_berths(graph))
         
-        # Get berths for adjacent stations (based on diagram_range)
-        # For now, we'll get immediately adjacent stations
-        # In a more sophisticated implementation, this would expand based on diagram_range
-        from .smart_utils import get_station_berths_with_connections
+        # Sequential berths walked outwards from the center station
+        for berth in layout["up_berths"]:
+            watched.append((berth["td_area"], berth["berth_id"]))
+        for berth in layout["down_berths"]:
+            watched.append((berth["td_area"], berth["berth_id"]))
         
-        station_data = get_station_berths_with_connections(graph, self._center_stanox, self._diagram_range * 3)
+        result = frozenset(watched)
+        self._watched_berths_cache = (last_updated, result)
+        return result
+
+    def _get_all_diagram_berths(self, graph: dict[str, Any]) -> frozenset[tuple[str, str]]:
+        """Get all (td_area, berth_id) pairs in the diagram area.
+        
+        The berths depend only on SMART data, so the result is cached until
+        the SMART data is reloaded.
+        """
+        if not graph:
+            return frozenset()
         
-        # Add berths from up connections
+        last_updated = self.smart_manager.get_last_updated()
+        if self._berths_cache and self._berths_cache[0] == last_updated:
+            return self._berths_cache[1]
+        
+        # Center station plus adjacent stations (based on diagram_range)
+        station_data = self._get_diagram_layout(graph)["station_data"]
+        stanoxes = [self._center_stanox]
         for conn in station_data.get("up_connections", [])[:self._diagram_range]:
-            conn_stanox = conn.get("stanox")
-            if conn_stanox:
-                conn_berths = get_berths_for_stanox(graph, conn_stanox)
-                for berth_info in conn_berths:
-                    td_area = berth_info.get("td_area", "")
-                    from_berth = berth_info.get("from_berth", "")
-                    to_berth = berth_info.get("to_berth", "")
-                    if from_berth and td_area:
-                        all_berths.add(f"{td_area}:{from_berth}")
-                    if to_berth and td_area:
-                        all_berths.add(f"{td_area}:{to_berth}")
-        
-        # Add berths from down connections
+            stanoxes.append(conn.get("stanox"))
         for conn in station_data.get("down_connections", [])[:self._diagram_range]:
-            conn_stanox = conn.get("stanox")
-            if conn_stanox:
-                conn_berths = get_berths_for_stanox(graph, conn_stanox)
-                for berth_info in conn_berths:
-                    td_area = berth_info.get("td_area", "")
-                    from_berth = berth_info.get("from_berth", "")
-                    to_berth = berth_info.get("to_berth", "")
-                    if from_berth and td_area:
-                        all_berths.add(f"{td_area}:{from_berth}")
-                    if to_berth and td_area:
-                        all_berths.add(f"{td_area}:{to_berth}")
+            stanoxes.append(conn.get("stanox"))
+        
+        all_berths: list[tuple[str, str]] = []
+        for stanox in stanoxes:
+            if not stanox:
+                continue
+            for berth_info in get_berths_for_stanox(graph, stanox):
+                td_area = berth_info.get("td_area", "")
+                from_berth = berth_info.get("from_berth", "")
+                to_berth = berth_info.get("to_berth", "")
+                if from_berth and td_area:
+                    all_berths.append((td_area, from_berth))
+                if to_berth and td_area:
+                    all_berths.append((td_area, to_berth))
         
-        return all_berths
+        result = frozenset(all_berths)
+        keys = frozenset(f"{td_area}:{berth_id}" for td_area, berth_id in result)
+        self._berths_cache = (last_updated, result, keys)
+        return result
 
+    def _get_all_diagram_berth_keys(self, graph: dict[str, Any]) -> frozenset[str]:
+        """Get the "area:berth" state keys of all berths in the diagram area."""
+        if not graph:
+            return frozenset()
+        
+        self._get_all_diagram_berths(graph)
+        return self._berths_cache[2]
 
 
-    def _build_station_berths_with_occupancy(
+
+    def _get_diagram_layout(self, graph: dict[str, Any]) -> dict[str, Any]:
+        """Get the graph-derived structure of the diagram.
+        
+        Everything here depends only on SMART data (station connections, berth
+        lists and the sequential berth walk), so it is cached until the SMART
+        data is reloaded. Live occupancy is overlaid by the callers.
+        
+        Returns:
+            Dictionary with the station data and berth skeletons for each part
+            of the diagram
+        """
+        last_updated = self.smart_manager.get_last_updated()
+        if self._layout_cache and self._layout_cache[0] == last_updated:
+            return self._layout_cache[1]
+        
+        station_data = get_station_berths_with_connections(graph, self._center_stanox, self._diagram_range * 3)
+        
+        center_berths = [
+            (berth_info.get("berth_id", ""), berth_info.get("td_area", ""), berth_info.get("platform", ""))
+            for berth_info in station_data.get("berths", [])
+        ]
+        
+        # Sequential berth walks start from the center berths
+        center_berth_keys = {
+            f"{td_area}:{berth_id}"
+            for berth_id, td_area, _platform in center_berths
+            if td_area and berth_id
+        }
+        max_berths = self._diagram_range * BERTHS_PER_STATION_ESTIMATE
+        
+        layout = {
+            "station_data": station_data,
+            "center_name": station_data.get("stanme", ""),
+            "center_berths": center_berths,
+            "up_stations": self._build_station_skeletons(station_data.get("up_connections", []), graph),
+            "down_stations": self._build_station_skeletons(station_data.get("down_connections", []), graph),
+            "up_berths": get_sequential_berths(graph, center_berth_keys, direction="up", max_berths=max_berths),
+            "down_berths": get_sequential_berths(graph, center_berth_keys, direction="down", max_berths=max_berths),
+        }
+        self._layout_cache = (last_updated, layout)
+        return layout
+
+    def _build_station_skeletons(
         self,
         connections: list[dict[str, Any]],
         graph: dict[str, Any]
-    ) -> list[dict[str, Any]]:
-        """Build list of stations with berth occupancy data. 
+    ) -> list[tuple[str, str, list[tuple[str, str, str, str]]]]:
+        """Build the berth skeleton for each connected station.
         
         Args:
             connections: List of connection dictionaries with 'stanox' keys
-            graph:  SMART data graph
+            graph: SMART data graph
             
-        Returns: 
-            List of station dictionaries with berth occupancy
+        Returns:
+            List of (stanox, name, berths) tuples, where berths holds
+            (berth_id, td_area, platform, stanme) for each berth at the station
         """
-        from .smart_utils import get_berths_for_stanox
-        
-        berth_state = self.hub.state.berth_state
         stations = []
         
         # Only include stations up to diagram_range
@@ -1241,45 +1321,69 @@ class NetworkDiagramSensor(SensorEntity):
             if not stanox:
                 continue
             
-            # Get berths for this station
-            station_berths = get_berths_for_stanox(graph, stanox)
-            
-            # Build berth list with occupancy
-            berths_list = []
-            for berth_info in station_berths: 
+            berths = []
+            for berth_info in get_berths_for_stanox(graph, stanox):
                 berth_id = berth_info.get("from_berth") or berth_info.get("to_berth")
                 td_area = berth_info.get("td_area", "")
                 
                 if not berth_id or not td_area:
                     continue
                 
-                # Get occupancy from live TD data
-                occupied = False
-                headcode = None
+                berths.append((berth_id, td_area, berth_info.get("platform", ""), berth_info.get("stanme", "")))
+            
+            stations.append((stanox, conn.get("stanme", ""), berths))
+        
+        return stations
+
+    def _build_station_berths_with_occupancy(
+        self,
+        station_skeletons: list[tuple[str, str, list[tuple[str, str, str, str]]]],
+    ) -> list[dict[str, Any]]:
+        """Build list of stations with berth occupancy data. 
+        
+        Args:
+            station_skeletons: Cached station skeletons from _build_station_skeletons
+            
+        Returns: 
+            List of station dictionaries with berth occupancy
+        """
+        berth_state = self.hub.state.berth_state
+        stations = []
+        
+        for stanox, name, berths in station_skeletons:
+            # Build berth list with occupancy from live TD data
+            berths_list = []
+            for berth_id, td_area, platform, stanme in berths:
                 berth_data = berth_state.get_berth(td_area, berth_id)
-                if berth_data:
-                    occupied = True
-                    headcode = berth_data.get("description")
-                
                 berths_list.append({
                     "berth_id": berth_id,
                     "td_area": td_area,
-                    "platform": berth_info.get("platform", ""),
-                    "occupied": occupied,
-                    "headcode": headcode,
-                    "stanox": stanox,  # NEW: Add stanox to station berths
-                    "stanme": berth_info.get("stanme", ""),  # NEW: Add stanme to station berths
+                    "platform": platform,
+                    "occupied": berth_data is not None,
+                    "headcode": berth_data.get("description") if berth_data else None,
+                    "stanox": stanox,
+                    "stanme": stanme,
                 })
             
             stations.append({
                 "stanox": stanox,
-                "name": conn.get("stanme", ""),
-                "berths":  berths_list,
+                "name": name,
+                "berths": berths_list,
             })
         
         return stations
 
-    
+    def _build_sequential_berths_with_occupancy(self, berths: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Copy cached sequential berths and add live occupancy data."""
+        berth_state = self.hub.state.berth_state
+        result = []
+        for berth in berths:
+            berth_data = berth_state.get_berth(berth["td_area"], berth["berth_id"])
+            berth = dict(berth)
+            berth["occupied"] = bool(berth_data)
+            berth["headcode"] = berth_data.get("description") if berth_data else None
+            result.append(berth)
+        return result
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -1293,102 +1397,41 @@ class NetworkDiagramSensor(SensorEntity):
         
         graph = self.smart_manager.get_graph()
         berth_state = self.hub.state.berth_state
-        
-        from .smart_utils import get_berths_for_stanox, get_station_berths_with_connections, get_sequential_berths
-        
-        # Get station data with connections
-        station_data = get_station_berths_with_connections(graph, self._center_stanox, self._diagram_range * 3)
+        layout = self._get_diagram_layout(graph)
+        center_name = layout["center_name"]
         
         # Build center berths with occupancy
         center_berths = []
-        for berth_info in station_data.get("berths", []):
-            berth_id = berth_info.get("berth_id", "")
-            td_area = berth_info.get("td_area", "")
-            
+        for berth_id, td_area, platform in layout["center_berths"]:
             # Get occupancy from live TD data
-            occupied = False
-            headcode = None
-            if td_area and berth_id:
-                berth_data = berth_state.get_berth(td_area, berth_id)
-                if berth_data:
-                    occupied = True
-                    headcode = berth_data.get("description")
-            
+            berth_data = berth_state.get_berth(td_area, berth_id) if td_area and berth_id else None
             center_berths.append({
                 "berth_id": berth_id,
                 "td_area": td_area,
-                "platform": berth_info.get("platform", ""),
-                "occupied": occupied,
-                "headcode": headcode,
-                "stanox": self._center_stanox,  # NEW: Add stanox to center berths
-                "stanme": station_data.get("stanme", ""),  # NEW: Add stanme to center berths
+                "platform": platform,
+                "occupied": berth_data is not None,
+                "headcode": berth_data.get("description") if berth_data else None,
+                "stanox": self._center_stanox,
+                "stanme": center_name,
             })
         
-        # Build up stations with occupancy
-        up_stations = self._build_station_berths_with_occupancy(
-            station_data.get("up_connections", []),
-            graph
-        )
-        
-        # Build down stations with occupancy
-        down_stations = self._build_station_berths_with_occupancy(
-            station_data.get("down_connections", []),
-            graph
-        )
-        
         last_updated = self.smart_manager.get_last_updated()
         
         # Base attributes
         attrs = {
             "center_stanox": self._center_stanox,
-            "center_name": station_data.get("stanme", ""),
+            "center_name": center_name,
             "center_berths": center_berths,
-            "up_stations": up_stations,
-            "down_stations": down_stations,
+            "up_stations": self._build_station_berths_with_occupancy(layout["up_stations"]),
+            "down_stations": self._build_station_berths_with_occupancy(layout["down_stations"]),
             "smart_data_available": True,
             "smart_data_last_updated": last_updated.isoformat() if last_updated else None,
             "diagram_range": self._diagram_range,
+            # Sequential berth lists with live occupancy
+            "up_berths": self._build_sequential_berths_with_occupancy(layout["up_berths"]),
+            "down_berths": self._build_sequential_berths_with_occupancy(layout["down_berths"]),
         }
         
-        # NEW: Build sequential berth lists for Phase 1
-        # Get center berth keys
-        center_berth_keys = {
-            f"{b['td_area']}:{b['berth_id']}" 
-            for b in center_berths 
-            if b['td_area'] and b['berth_id']
-        }
-        
-        # Build up_berths and down_berths
-        up_berths_sequential = get_sequential_berths(
-            graph, 
-            center_berth_keys,
-            direction="up",
-            max_berths=self._diagram_range * BERTHS_PER_STATION_ESTIMATE
-        )
-        
-        down_berths_sequential = get_sequential_berths(
-            graph,
-            center_berth_keys, 
-            direction="down",
-            max_berths=self._diagram_range * BERTHS_PER_STATION_ESTIMATE
-        )
-        
-        # Add occupancy data to sequential berths
-        # Process lists separately to avoid unnecessary concatenation
-        for berth in up_berths_sequential:
-            berth_data = berth_state.get_berth(berth['td_area'], berth['berth_id'])
-            berth['occupied'] = bool(berth_data)
-            berth['headcode'] = berth_data.get("description") if berth_data else None
-        
-        for berth in down_berths_sequential:
-            berth_data = berth_state.get_berth(berth['td_area'], berth['berth_id'])
-            berth['occupied'] = bool(berth_data)
-            berth['headcode'] = berth_data.get("description") if berth_data else None
-        
-        # Add to attributes
-        attrs["up_berths"] = up_berths_sequential
-        attrs["down_berths"] = down_berths_sequential
-        
         # Add train tracking data if alerts are enabled
         if self._alert_services:
             trains_list = []
@@ -1401,7 +1444,7 @@ class NetworkDiagramSensor(SensorEntity):
                     "current_berth": train_data.get("current_berth"),
                     "entered_diagram_at": train_data.get("entered_at"),
                     "time_in_diagram_seconds": self._calculate_time_in_diagram(train_data),
-                    "berths_visited": train_data.get("berths_visited", []),
+                    "berths_visited": list(train_data.get("berths_visited", ())),
                 }
                 
                 # Add VSTP data if available
@@ -1440,7 +1483,7 @@ class NetworkDiagramSensor(SensorEntity):
 
 class TrackSectionSensor(SensorEntity):
     """Sensor that monitors trains along a defined track section."""
-    
+
     _attr_has_entity_name = True
     _attr_icon = "mdi:train-car-container"
     
@@ -1464,16 +1507,20 @@ class TrackSectionSensor(SensorEntity):
         self._section_name = section_config.get("name", "Unknown")
         self._center_stanox = section_config.get("center_stanox", "")
         self._berth_range = section_config.get("berth_range", 3)
-        self._td_areas = section_config.get("td_areas", [])
+        self._td_areas = tuple(section_config.get("td_areas", []))
+        self._td_areas_set: frozenset[str] = frozenset(self._td_areas)
         self._alert_services = section_config.get("alert_services", {})
         
         # Train tracking
-        self._trains_in_section: dict[str, dict[str, Any]] = {}
+        self._trains_in_section: dict[str, _TrackedTrain] = {}
+        self._vstp_cache: dict[str, tuple[dict[str, Any], dict[str, Any], tuple[str | None, str | None]]] = {}
+        self._empty_attrs_cache: tuple[tuple[str, ...], dict[str, Any]] | None = None
         
-        # Section berths (calculated from SMART data)
-        self._section_berths: set[str] = set()
-        self._calculate_section_berths()
+        # Section berths grouped by TD area plus the sorted "area:berth" keys for
+        # the attributes, calculated from SMART data on first use
+        self._berths_cache: tuple[Any, dict[str, frozenset[str]], tuple[str, ...]] | None = None
         
+        self._write_handle: asyncio.Handle | None = None  # Write queued for this loop tick
         self._unsub_td = None
         self._unsub_vstp = None
     
@@ -1495,44 +1542,34 @@ class TrackSectionSensor(SensorEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return sensor attributes."""
+        if not self._trains_in_section:
+            return self._get_empty_attributes()
+        
         trains_list = []
         alert_count = 0
         
-        for train_id, train_data in self._trains_in_section.items():
+        for train_id, train in self._trains_in_section.items():
             train_info = {
                 "train_id": train_id,
-                "headcode": train_data.get("headcode", train_id),
-                "current_berth": train_data.get("current_berth"),
-                "current_platform": train_data.get("current_platform"),
-                "direction": train_data.get("direction"),
-                "entered_section_at": train_data.get("entered_at"),
-                "time_in_section_seconds": self._calculate_time_in_section(train_data),
-                "berths_visited": train_data.get("berths_visited", []),
-                "berths_ahead": self._calculate_berths_ahead(train_data),
+                "headcode": train.headcode,
+                "current_berth": train.current_berth,
+                "current_platform": None,
+                "direction": None,
+                "entered_section_at": train.entered_at,
+                "time_in_section_seconds": self._calculate_time_in_section(train),
+                "berths_visited": list(train.berths_visited),
+                "berths_ahead": self._calculate_berths_ahead(train),
             }
             
-            # Add VSTP data if available
-            vstp_data = train_data.get("vstp_data")
-            if vstp_data:
-                train_info.update({
-                    "service_type": train_data.get("service_type"),
-                    "category": vstp_data.get("CIF_train_category"),
-                    "origin": train_data.get("origin"),
-                    "destination": train_data.get("destination"),
-                    "operator": train_data.get("operator"),
-                    "power_type": vstp_data.get("CIF_power_type"),
-                    "train_class": vstp_data.get("train_class"),
-                    "next_scheduled_stop": train_data.get("next_stop"),
-                    "scheduled_arrival": train_data.get("scheduled_arrival"),
-                    "scheduled_platform": train_data.get("scheduled_platform"),
-                    "running_status": train_data.get("running_status", "unknown"),
-                })
+            # Add VSTP data if available (built once when the train entered)
+            if train.static_attrs:
+                train_info.update(train.static_attrs)
             
             # Add alert information
-            if train_data.get("triggers_alert", False):
+            if train.triggers_alert:
                 alert_count += 1
                 train_info["triggers_alert"] = True
-                train_info["alert_reason"] = train_data.get("alert_reason")
+                train_info["alert_reason"] = train.alert_reason
             else:
                 train_info["triggers_alert"] = False
                 train_info["alert_reason"] = None
@@ -1541,17 +1578,41 @@ class TrackSectionSensor(SensorEntity):
         
         return {
             "trains_in_section": trains_list,
-            "section_config": {
-                "name": self._section_name,
-                "center_stanox": self._center_stanox,
-                "berth_range": self._berth_range,
-                "td_areas": self._td_areas,
-            },
-            "section_berths": list(self._section_berths),
+            "section_config": self._get_section_config(),
+            "section_berths": self._get_section_berths_snapshot(),
             "total_trains": len(self._trains_in_section),
             "alert_trains": alert_count,
         }
     
+    def _get_section_config(self) -> dict[str, Any]:
+        """Get the configured section details exposed as an attribute."""
+        return {
+            "name": self._section_name,
+            "center_stanox": self._center_stanox,
+            "berth_range": self._berth_range,
+            "td_areas": self._td_areas,
+        }
+    
+    def _get_empty_attributes(self) -> dict[str, Any]:
+        """Get the attributes for a section with no trains.
+        
+        The payload only changes when the section berths do, so it is built
+        once per SMART data load and reused.
+        """
+        section_berths = self._get_section_berths_snapshot()
+        if self._empty_attrs_cache and self._empty_attrs_cache[0] is section_berths:
+            return self._empty_attrs_cache[1]
+        
+        attrs = {
+            "trains_in_section": [],
+            "section_config": self._get_section_config(),
+            "section_berths": section_berths,
+            "total_trains": 0,
+            "alert_trains": 0,
+        }
+        self._empty_attrs_cache = (section_berths, attrs)
+        return attrs
+    
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information."""
@@ -1564,7 +1625,6 @@ class TrackSectionSensor(SensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Subscribe to TD and VSTP events."""
-        from .const import DISPATCH_TD, DISPATCH_VSTP
         
         # Subscribe to TD events
         self._unsub_td = async_dispatcher_connect(
@@ -1583,13 +1643,22 @@ class TrackSectionSensor(SensorEntity):
             self._unsub_td()
         if self._unsub_vstp:
             self._unsub_vstp()
+        if self._write_handle:
+            self._write_handle.cancel()
+            self._write_handle = None
     
-    def _calculate_section_berths(self) -> None:
-        """Calculate which berths are in this section using SMART data."""
+    def _get_section_berths_by_area(self) -> dict[str, frozenset[str]]:
+        """Get the berths in this section using SMART data, grouped by TD area.
+        
+        Calculated lazily so SMART data loaded after setup is picked up, and
+        cached until the SMART data is reloaded.
+        """
         if not self.smart_manager or not self.smart_manager.is_available():
-            return
+            return {}
         
-        from .smart_utils import get_berths_for_stanox
+        last_updated = self.smart_manager.get_last_updated()
+        if self._berths_cache and self._berths_cache[0] == last_updated:
+            return self._berths_cache[1]
         
         graph = self.smart_manager.get_graph()
         
@@ -1597,80 +1666,132 @@ class TrackSectionSensor(SensorEntity):
         center_berths = get_berths_for_stanox(graph, self._center_stanox)
         
         # Add center berths to section
+        berths_by_area: dict[str, set[str]] = {}
         for berth_info in center_berths:
             td_area = berth_info.get("td_area", "")
             from_berth = berth_info.get("from_berth", "")
             to_berth = berth_info.get("to_berth", "")
             
             if from_berth:
-                self._section_berths.add(f"{td_area}:{from_berth}")
+                berths_by_area.setdefault(td_area, set()).add(from_berth)
             if to_berth:
-                self._section_berths.add(f"{td_area}:{to_berth}")
-        
-        # If no SMART data available or no TD areas configured, use TD areas from config
-        if not self._section_berths and self._td_areas:
-            # This is a fallback - we'll just monitor all berths in configured areas
-            pass
+                berths_by_area.setdefault(td_area, set()).add(to_berth)
+        
+        result = {td_area: frozenset(berth_ids) for td_area, berth_ids in berths_by_area.items()}
+        snapshot = tuple(sorted(
+            f"{td_area}:{berth_id}"
+            for td_area, berth_ids in result.items()
+            for berth_id in berth_ids
+        ))
+        self._berths_cache = (last_updated, result, snapshot)
+        return result
+    
+    def _get_section_berths_snapshot(self) -> tuple[str, ...]:
+        """Get the section's berth keys ("area:berth"), sorted, for the attributes."""
+        if not self._get_section_berths_by_area():
+            return ()
+        return self._berths_cache[2]
     
     @callback
     def _handle_td_message(self, td_message: dict[str, Any]) -> None:
         """Handle TD message and update train positions."""
         msg_type = td_message.get("msg_type")
+        handler = self._TD_HANDLERS.get(msg_type)
+        if handler is None:
+            return
+        
         area_id = td_message.get("area_id")
         
         # Check if this message is for our monitored areas
-        if self._td_areas and area_id not in self._td_areas:
+        if self._td_areas_set and area_id not in self._td_areas_set:
             return
         
-        # Handle berth step (CA) - train moved from one berth to another
-        if msg_type == "CA":
-            from_berth = td_message.get("from")
-            to_berth = td_message.get("to")
-            headcode = td_message.get("descr")
-            
-            if not headcode:
-                return
-            
-            from_berth_key = f"{area_id}:{from_berth}" if from_berth else None
-            to_berth_key = f"{area_id}:{to_berth}" if to_berth else None
-            
-            # Check if train is entering, leaving, or moving within section
-            from_in_section = from_berth_key in self._section_berths if from_berth_key else False
-            to_in_section = to_berth_key in self._section_berths if to_berth_key else False
-            
-            if to_in_section and not from_in_section:
-                # Train entering section
-                self._train_entered_section(to_berth_key, headcode, td_message)
-            elif from_in_section and not to_in_section:
-                # Train leaving section
-                self._train_left_section(headcode)
-            elif from_in_section and to_in_section:
-                # Train moving within section
-                self._train_moved_in_section(from_berth_key, to_berth_key, headcode, td_message)
+        # Messages from areas with no section berths can't affect this section
+        area_berths = self._get_section_berths_by_area().get(area_id)
+        if not area_berths:
+            return
         
-        # Handle berth cancel (CB) - train disappeared from berth
-        elif msg_type == "CB":
-            from_berth = td_message.get("from")
-            headcode = td_message.get("descr")
-            
-            if headcode and from_berth:
-                from_berth_key = f"{area_id}:{from_berth}"
-                if from_berth_key in self._section_berths:
-                    # Train cancelled in section - remove it
-                    self._train_left_section(headcode)
+        headcode = td_message.get("descr")
+        if not headcode:
+            return
+        from_berth = td_message.get("from")
+        to_berth = td_message.get("to")
         
-        # Handle berth interpose (CC) - train appeared in berth
-        elif msg_type == "CC":
-            to_berth = td_message.get("to")
-            headcode = td_message.get("descr")
-            
-            if headcode and to_berth:
-                to_berth_key = f"{area_id}:{to_berth}"
-                if to_berth_key in self._section_berths:
-                    # Train interposed in section
-                    self._train_entered_section(to_berth_key, headcode, td_message)
+        changed = handler(self, area_id, area_berths, from_berth, to_berth, headcode, td_message)
         
-        # Trigger update
+        # Only write state when the trains in the section changed, and coalesce
+        # changes from messages handled in the same loop iteration into one write
+        if changed and self._write_handle is None:
+            self._write_handle = self.hass.loop.call_soon(self._flush_write)
+    
+    def _handle_berth_step(
+        self,
+        area_id: str,
+        area_berths: frozenset[str],
+        from_berth: str | None,
+        to_berth: str | None,
+        headcode: str,
+        td_message: dict[str, Any],
+    ) -> bool:
+        """Handle berth step (CA) - train moved from one berth to another."""
+        # Check if train is entering, leaving, or moving within section
+        from_in_section = from_berth in area_berths
+        to_in_section = to_berth in area_berths
+        
+        if to_in_section and not from_in_section:
+            # Train entering section
+            return self._train_entered_section(f"{area_id}:{to_berth}", headcode, td_message)
+        if from_in_section and not to_in_section:
+            # Train leaving section
+            return self._train_left_section(headcode)
+        if from_in_section and to_in_section:
+            # Train moving within section
+            return self._train_moved_in_section(
+                f"{area_id}:{from_berth}", f"{area_id}:{to_berth}", headcode, td_message
+            )
+        return False
+    
+    def _handle_berth_cancel(
+        self,
+        area_id: str,
+        area_berths: frozenset[str],
+        from_berth: str | None,
+        to_berth: str | None,
+        headcode: str,
+        td_message: dict[str, Any],
+    ) -> bool:
+        """Handle berth cancel (CB) - train disappeared from berth."""
+        if from_berth in area_berths:
+            # Train cancelled in section - remove it
+            return self._train_left_section(headcode)
+        return False
+    
+    def _handle_berth_interpose(
+        self,
+        area_id: str,
+        area_berths: frozenset[str],
+        from_berth: str | None,
+        to_berth: str | None,
+        headcode: str,
+        td_message: dict[str, Any],
+    ) -> bool:
+        """Handle berth interpose (CC) - train appeared in berth."""
+        if to_berth in area_berths:
+            # Train interposed in section
+            return self._train_entered_section(f"{area_id}:{to_berth}", headcode, td_message)
+        return False
+    
+    # TD message type -> handler, looked up once per message
+    _TD_HANDLERS = {
+        "CA": _handle_berth_step,
+        "CB": _handle_berth_cancel,
+        "CC": _handle_berth_interpose,
+    }
+    
+    @callback
+    def _flush_write(self) -> None:
+        """Write the coalesced state change to Home Assistant."""
+        self._write_handle = None
         self.async_write_ha_state()
     
     @callback
@@ -1680,64 +1801,76 @@ class TrackSectionSensor(SensorEntity):
         # We'll query it when we need schedule data
         pass
     
-    def _train_entered_section(self, berth: str, headcode: str, td_message: dict[str, Any]) -> None:
-        """Handle train entering the section."""
-        now = dt_util.now()
+    def _train_entered_section(self, berth: str, headcode: str, td_message: dict[str, Any]) -> bool:
+        """Handle train entering the section.
         
+        Returns:
+            True, as the train is always (re)recorded
+        """
         # Get VSTP data if available
         vstp_data = None
         service_classification = None
+        origin = destination = None
         if self.vstp_manager:
             vstp_data = self.vstp_manager.get_schedule_for_headcode(headcode)
             
             if vstp_data:
-                # Classify the service
-                from .service_classifier import classify_service
-                service_classification = classify_service(vstp_data, headcode)
+                # Classify the service (reused while the schedule is unchanged)
+                service_classification, (origin, destination) = _classify_vstp_service(
+                    self._vstp_cache, self.vstp_manager, vstp_data, headcode
+                )
         
         # Create train data
-        train_data = {
-            "headcode": headcode,
-            "current_berth": berth,
-            "entered_at": now.isoformat(),
-            "berths_visited": [berth],
-            "td_message": td_message,
-        }
+        train = _TrackedTrain(headcode, berth, td_message)
         
         # Add VSTP enrichment if available
         if vstp_data and service_classification:
-            origin, destination = self.vstp_manager.get_origin_destination(vstp_data) if self.vstp_manager else (None, None)
+            train.vstp_data = vstp_data
+            train.service_type = service_classification.get("service_type")
+            train.service_category = service_classification.get("service_category")
+            train.description = service_classification.get("description")
+            train.origin = origin
+            train.destination = destination
+            train.is_freight = service_classification.get("is_freight", False)
+            train.is_passenger = service_classification.get("is_passenger", False)
+            train.is_special = service_classification.get("is_special", False)
+            train.special_types = service_classification.get("special_types", [])
             
-            train_data.update({
-                "vstp_data": vstp_data,
-                "service_type": service_classification.get("service_type"),
-                "service_category": service_classification.get("service_category"),
-                "description": service_classification.get("description"),
+            # VSTP-derived attributes don't change while the train is in the section
+            train.static_attrs = {
+                "service_type": train.service_type,
+                "category": vstp_data.get("CIF_train_category"),
                 "origin": origin,
                 "destination": destination,
-                "is_freight": service_classification.get("is_freight", False),
-                "is_passenger": service_classification.get("is_passenger", False),
-                "is_special": service_classification.get("is_special", False),
-                "special_types": service_classification.get("special_types", []),
-            })
+                "operator": None,
+                "power_type": vstp_data.get("CIF_power_type"),
+                "train_class": vstp_data.get("train_class"),
+                "next_scheduled_stop": None,
+                "scheduled_arrival": None,
+                "scheduled_platform": None,
+                "running_status": "unknown",
+            }
             
             # Check if this should trigger an alert
-            from .service_classifier import should_alert_for_service
             should_alert, alert_reason = should_alert_for_service(service_classification, self._alert_services)
-            train_data["triggers_alert"] = should_alert
-            train_data["alert_reason"] = alert_reason
+            train.triggers_alert = should_alert
+            train.alert_reason = alert_reason
             
             # Fire alert event if needed
             if should_alert:
-                self._fire_track_alert(headcode, train_data, alert_reason)
+                self._fire_track_alert(train, alert_reason)
         
         # Store train data
-        self._trains_in_section[headcode] = train_data
+        self._trains_in_section[headcode] = train
+        return True
     
-    def _train_left_section(self, headcode: str) -> None:
-        """Handle train leaving the section."""
-        if headcode in self._trains_in_section:
-            del self._trains_in_section[headcode]
+    def _train_left_section(self, headcode: str) -> bool:
+        """Handle train leaving the section.
+        
+        Returns:
+            True if the train was being tracked
+        """
+        return self._trains_in_section.pop(headcode, None) is not None
     
     def _train_moved_in_section(
         self, 
@@ -1745,38 +1878,33 @@ class TrackSectionSensor(SensorEntity):
         to_berth: str, 
         headcode: str,
         td_message: dict[str, Any]
-    ) -> None:
-        """Handle train moving within the section."""
-        if headcode in self._trains_in_section:
-            train_data = self._trains_in_section[headcode]
-            train_data["current_berth"] = to_berth
-            train_data["berths_visited"].append(to_berth)
-            train_data["td_message"] = td_message
-        else:
-            # Train wasn't tracked - add it now
-            self._train_entered_section(to_berth, headcode, td_message)
+    ) -> bool:
+        """Handle train moving within the section.
+        
+        Returns:
+            True, as the train's position is always updated
+        """
+        train = self._trains_in_section.get(headcode)
+        if train is not None:
+            train.current_berth = to_berth
+            if train.berths_visited[-1] != to_berth:
+                train.berths_visited.append(to_berth)
+            train.td_message = td_message
+            return True
+        # Train wasn't tracked - add it now
+        return self._train_entered_section(to_berth, headcode, td_message)
     
-    def _calculate_time_in_section(self, train_data: dict[str, Any]) -> int:
+    def _calculate_time_in_section(self, train: _TrackedTrain) -> int:
         """Calculate how long train has been in section (seconds)."""
-        entered_at_str = train_data.get("entered_at")
-        if not entered_at_str:
-            return 0
-        
-        try:
-            entered_at = datetime.fromisoformat(entered_at_str)
-            now = dt_util.now()
-            delta = now - entered_at
-            return int(delta.total_seconds())
-        except Exception:
-            return 0
+        return int(time.monotonic() - train.entered_at_monotonic)
     
-    def _calculate_berths_ahead(self, train_data: dict[str, Any]) -> list[str]:
+    def _calculate_berths_ahead(self, train: _TrackedTrain) -> list[str]:
         """Calculate berths ahead of train in section.
         
         TODO: Implement this using SMART data to find berths ahead in the direction of travel.
         For now, returns empty list as this is an enhancement for future releases.
         """
-        current_berth = train_data.get("current_berth")
+        current_berth = train.current_berth
         if not current_berth or not self.smart_manager or not self.smart_manager.is_available():
             return []
         
@@ -1784,20 +1912,20 @@ class TrackSectionSensor(SensorEntity):
         # and find berths ahead based on direction of travel
         return []
     
-    def _fire_track_alert(self, headcode: str, train_data: dict[str, Any], alert_reason: str) -> None:
+    def _fire_track_alert(self, train: _TrackedTrain, alert_reason: str) -> None:
         """Fire a Home Assistant event for track section alert."""
         event_data = {
             "section_name": self._section_name,
-            "train_id": headcode,
-            "headcode": headcode,
-            "alert_type": train_data.get("service_type", "unknown"),
+            "train_id": train.headcode,
+            "headcode": train.headcode,
+            "alert_type": train.service_type or "unknown",
             "alert_reason": alert_reason,
-            "current_berth": train_data.get("current_berth"),
-            "service_type": train_data.get("service_type"),
-            "origin": train_data.get("origin"),
-            "destination": train_data.get("destination"),
-            "operator": train_data.get("operator"),
-            "entered_at": train_data.get("entered_at"),
+            "current_berth": train.current_berth,
+            "service_type": train.service_type,
+            "origin": train.origin,
+            "destination": train.destination,
+            "operator": None,
+            "entered_at": train.entered_at,
         }
         
         self.hass.bus.async_fire("homeassistant_network_rail_uk_track_alert", event_data)
@@ -4,20 +4,82 @@ from __future__ import annotations
 
 import base64
 import gzip
+import io
 import json
 import logging
 import os
-from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import aiohttp
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util.json import json_loads
 
-from .const import SMART_CACHE_EXPIRY_DAYS, SMART_CACHE_FILE, SMART_DATA_URL
+from .const import (
+    DISPATCH_SMART_LOADED,
+    SMART_CACHE_EXPIRY_DAYS,
+    SMART_CACHE_FILE,
+    SMART_LEGACY_CACHE_FILE,
+    SMART_DATA_URL,
+    SMART_ETAG_FILE,
+    SMART_READ_CHUNK_SIZE,
+)
+from .smart_utils import build_berth_neighbors
 
 _LOGGER = logging.getLogger(__name__)
 
+_CACHE_EXPIRY_SECONDS = SMART_CACHE_EXPIRY_DAYS * 86400
+
+# SMART record fields read by _build_graph, fetched together in one call
+_SMART_FIELDS = (
+    "TD", "FROMBERTH", "TOBERTH", "STANOX", "STEPTYPE",
+    "FROMLINE", "TOLINE", "STANME", "PLATFORM", "EVENT",
+)
+_get_smart_fields = itemgetter(*_SMART_FIELDS)
+
+try:
+    # ISA-L inflates considerably faster than zlib and is usually installed
+    # alongside Home Assistant; its API mirrors the stdlib modules.
+    from isal import igzip as _gzip, isal_zlib as _zlib
+except ImportError:  # pragma: no cover
+    import gzip as _gzip
+    import zlib as _zlib
+
+
+class BerthConnection(NamedTuple):
+    """A step between two berths, as stored in the SMART graph."""
+
+    berth: str
+    td_area: str
+    line: str
+    steptype: str
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a field by name, as for the dicts previously stored."""
+        return getattr(self, key, default)
+
+
+class StanoxBerth(NamedTuple):
+    """A berth step recorded against a STANOX in the SMART graph."""
+
+    td_area: str
+    from_berth: str
+    to_berth: str
+    stanme: str
+    platform: str
+    event: str
+    steptype: str
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a field by name, as for the dicts previously stored."""
+        return getattr(self, key, default)
+
 
 class SmartDataManager:
     """Manages SMART data download, caching, and parsing."""
@@ -33,14 +95,17 @@ class SmartDataManager:
         self.hass = hass
         self.username = username
         self.password = password
-        self._data: list[dict[str, Any]] = []
+        self._record_count = 0
         self._graph: dict[str, Any] = {}
         self._last_updated: datetime | None = None
+        self._etag: str | None = None
         
         # Cache file path in integration directory
         config_dir = Path(hass.config.path())
         integration_dir = config_dir / "custom_components" / "homeassistant_network_rail_uk"
         self.cache_path = integration_dir / SMART_CACHE_FILE
+        self.legacy_cache_path = integration_dir / SMART_LEGACY_CACHE_FILE
+        self.etag_path = integration_dir / SMART_ETAG_FILE
         
     async def load_data(self) -> bool:
         """Load SMART data from cache or download if needed.
@@ -50,49 +115,79 @@ class SmartDataManager:
         """
         # Try to load from cache first
         if await self._load_from_cache():
-            _LOGGER.info("Loaded SMART data from cache (%d records)", len(self._data))
+            _LOGGER.info("Loaded SMART data from cache (%d records)", self._record_count)
+            async_dispatcher_send(self.hass, DISPATCH_SMART_LOADED)
             return True
         
         # Cache is stale or doesn't exist, download fresh data
         _LOGGER.info("SMART data cache is stale or missing, downloading fresh data")
         return await self.refresh_data()
     
-    def _decompress_and_decode(self, raw_data: bytes) -> str | None:
-        """Decompress gzip data if needed and decode to UTF-8.
+    async def _read_content(self, response: aiohttp.ClientResponse) -> bytes | None:
+        """Read a SMART data response, decompressing gzip data as it streams.
+        
+        Compressed chunks are inflated as they arrive, so the whole compressed
+        payload is never held in memory alongside the decompressed data.
         
         Args:
-            raw_data: Raw bytes from response
+            response: Response whose body holds the SMART data
             
         Returns:
-            Decoded string content, or None if decompression/decoding failed
+            Decompressed content, or None if decompression failed
         """
+        decompressor = None
+        chunks: list[bytes] = []
+        head = b""
+        sniffed = False
+        received = 0
         try:
-            # Check if data is gzip compressed (magic bytes: 0x1f 0x8b)
-            if len(raw_data) >= 2 and raw_data[0] == 0x1f and raw_data[1] == 0x8b:
-                _LOGGER.debug("Data is gzip compressed, decompressing...")
-                decompressed = gzip.decompress(raw_data)
-                content = decompressed.decode('utf-8')
-                _LOGGER.debug(
-                    "Decompressed %d bytes to %d bytes",
-                    len(raw_data),
-                    len(decompressed)
-                )
-                return content
-            else:
-                # Not compressed, decode as UTF-8
-                _LOGGER.debug("Data is not gzip compressed")
-                content = raw_data.decode('utf-8')
-                return content
-        except gzip.error as exc:
+            async for chunk in response.content.iter_chunked(SMART_READ_CHUNK_SIZE):
+                received += len(chunk)
+                if not sniffed:
+                    # Check if data is gzip compressed (magic bytes: 0x1f 0x8b),
+                    # holding chunks back until both bytes have arrived
+                    head += chunk
+                    if len(head) < 2:
+                        continue
+                    chunk, head = head, b""
+                    sniffed = True
+                    if chunk[:2] == b"\x1f\x8b":
+                        _LOGGER.debug("Data is gzip compressed, decompressing...")
+                        decompressor = _zlib.decompressobj(wbits=31)
+                if not decompressor:
+                    chunks.append(chunk)
+                    continue
+                chunks.append(decompressor.decompress(chunk))
+                # A gzip file may hold several members; start a fresh
+                # decompressor for each one that follows the current member
+                while decompressor.eof and decompressor.unused_data:
+                    remaining = decompressor.unused_data
+                    decompressor = _zlib.decompressobj(wbits=31)
+                    chunks.append(decompressor.decompress(remaining))
+            if head:
+                chunks.append(head)
+            if decompressor:
+                chunks.append(decompressor.flush())
+                if not decompressor.eof:
+                    _LOGGER.error("Failed to decompress gzip data: download ended before the end of the stream")
+                    return None
+            
+            raw_data = b"".join(chunks)
+            chunks.clear()
+            _LOGGER.debug("Downloaded %d bytes (%d bytes decompressed)", received, len(raw_data))
+            # Kept as bytes: the JSON parser decodes UTF-8 itself, and the
+            # cache stores the same bytes
+            return raw_data
+        except _zlib.error as exc:
             _LOGGER.error("Failed to decompress gzip data: %s", exc)
             return None
-        except UnicodeDecodeError as exc:
-            _LOGGER.error("Failed to decode data as UTF-8: %s", exc)
-            return None
     
     async def refresh_data(self) -> bool:
         """Download fresh SMART data from Network Rail.
         
+        When data is already loaded, the download is conditional on the
+        cached payload's ETag, so an unchanged file is not fetched again.
+        
         Returns:
             True if data was downloaded and parsed successfully, False otherwise
         """
@@ -107,92 +202,103 @@ class SmartDataManager:
             timeout = aiohttp.ClientTimeout(total=60)
             
             # Step 1: Request from authenticating proxy with Basic Auth, but disable auto-redirects
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                headers = {"Authorization": f"Basic {auth_header}"}
+            # The shared session keeps connections to the proxy alive between
+            # refreshes; redirects are followed by hand below
+            session = async_get_clientsession(self.hass)
+            headers = {"Authorization": f"Basic {auth_header}"}
+            
+            _LOGGER.debug("Requesting SMART data with Basic Auth (redirects disabled)")
+            async with session.get(
+                SMART_DATA_URL,
+                headers=headers,
+                allow_redirects=False,
+                timeout=timeout,
+            ) as response:
+                _LOGGER.debug("Initial response status: %d", response.status)
                 
-                _LOGGER.debug("Requesting SMART data with Basic Auth (redirects disabled)")
-                async with session.get(
-                    SMART_DATA_URL,
-                    headers=headers,
-                    allow_redirects=False
-                ) as response:
-                    _LOGGER.debug("Initial response status: %d", response.status)
-                    
-                    # Check for authentication failure
-                    if response.status == 401:
-                        response_text = await response.text()
-                        _LOGGER.error(
-                            "Authentication failed when downloading SMART data (401 Unauthorized). "
-                            "Response: %s",
-                            response_text[:500]
-                        )
+                # Check for authentication failure
+                if response.status == 401:
+                    response_text = await response.text()
+                    _LOGGER.error(
+                        "Authentication failed when downloading SMART data (401 Unauthorized). "
+                        "Response: %s",
+                        response_text[:500]
+                    )
+                    return False
+                
+                # Check if it's a redirect
+                if response.status in (301, 302, 303, 307, 308):
+                    redirect_url = response.headers.get("Location")
+                    if not redirect_url:
+                        _LOGGER.error("Redirect response missing Location header")
                         return False
                     
-                    # Check if it's a redirect
-                    if response.status in (301, 302, 303, 307, 308):
-                        redirect_url = response.headers.get("Location")
-                        if not redirect_url:
-                            _LOGGER.error("Redirect response missing Location header")
-                            return False
+                    _LOGGER.debug("Following redirect to: %s", redirect_url)
+                    
+                    # Only revalidate data we hold; otherwise fetch it in full
+                    s3_headers = {}
+                    if self._etag and self._record_count:
+                        s3_headers["If-None-Match"] = self._etag
+                    
+                    # Step 2: Follow redirect to S3 WITHOUT auth headers
+                    async with session.get(
+                        redirect_url, headers=s3_headers, timeout=timeout
+                    ) as s3_response:
+                        _LOGGER.debug("S3 response status: %d", s3_response.status)
                         
-                        _LOGGER.debug("Following redirect to: %s", redirect_url)
+                        if s3_response.status == 304:
+                            return await self._handle_not_modified()
                         
-                        # Step 2: Follow redirect to S3 WITHOUT auth headers
-                        async with session.get(redirect_url) as s3_response:
-                            _LOGGER.debug("S3 response status: %d", s3_response.status)
-                            
-                            if s3_response.status != 200:
-                                error_text = await s3_response.text()
-                                _LOGGER.error(
-                                    "Failed to download SMART data from S3: HTTP %d. Response: %s",
-                                    s3_response.status,
-                                    error_text[:500]
-                                )
-                                return False
-                            
-                            # Read response as bytes (may be gzip compressed)
-                            raw_data = await s3_response.read()
-                            _LOGGER.debug("Downloaded %d bytes from S3", len(raw_data))
-                            
-                            # Decompress and decode the data
-                            content = self._decompress_and_decode(raw_data)
-                            if content is None:
-                                return False
-                    
-                    elif response.status == 200:
-                        # No redirect, data returned directly (unlikely but handle it)
-                        _LOGGER.debug("No redirect, reading data directly from initial response")
-                        raw_data = await response.read()
+                        if s3_response.status != 200:
+                            error_text = await s3_response.text()
+                            _LOGGER.error(
+                                "Failed to download SMART data from S3: HTTP %d. Response: %s",
+                                s3_response.status,
+                                error_text[:500]
+                            )
+                            return False
                         
-                        # Decompress and decode the data
-                        content = self._decompress_and_decode(raw_data)
+                        # Stream the response (may be gzip compressed)
+                        content = await self._read_content(s3_response)
                         if content is None:
                             return False
-                    
-                    else:
-                        error_text = await response.text()
-                        _LOGGER.error(
-                            "Unexpected response status %d. Response: %s",
-                            response.status,
-                            error_text[:500]
-                        )
+                        etag = s3_response.headers.get("ETag")
+                
+                elif response.status == 200:
+                    # No redirect, data returned directly (unlikely but handle it)
+                    _LOGGER.debug("No redirect, reading data directly from initial response")
+                    content = await self._read_content(response)
+                    if content is None:
                         return False
+                    etag = response.headers.get("ETag")
+                
+                else:
+                    error_text = await response.text()
+                    _LOGGER.error(
+                        "Unexpected response status %d. Response: %s",
+                        response.status,
+                        error_text[:500]
+                    )
+                    return False
             
             _LOGGER.debug("Successfully retrieved SMART data, size: %d bytes", len(content))
             
-            # Parse the data
-            if not self._parse_smart_data(content):
+            # Parse the data and build the graph structure off the event loop
+            result = await self.hass.async_add_executor_job(self._process_content, content)
+            if result is None:
                 _LOGGER.error("Failed to parse SMART data")
                 return False
-            
-            # Build the graph structure
-            self._build_graph()
+            self._record_count, self._graph = result
             
             # Save to cache
             self._last_updated = datetime.now(timezone.utc)
-            await self._save_to_cache(content)
+            self._etag = etag
+            await self.hass.async_add_executor_job(
+                self._save_to_cache, content, self._last_updated, etag
+            )
             
-            _LOGGER.info("Successfully downloaded and cached SMART data (%d records)", len(self._data))
+            _LOGGER.info("Successfully downloaded and cached SMART data (%d records)", self._record_count)
+            async_dispatcher_send(self.hass, DISPATCH_SMART_LOADED)
             return True
             
         except aiohttp.ClientError as exc:
@@ -202,221 +308,425 @@ class SmartDataManager:
             _LOGGER.error("Unexpected error downloading SMART data: %s", exc, exc_info=True)
             return False
     
-    def _parse_smart_data(self, content: str) -> bool:
+    async def _handle_not_modified(self) -> bool:
+        """Keep the loaded SMART data after S3 reports it unchanged.
+        
+        Returns:
+            True, as the loaded data is current
+        """
+        _LOGGER.info("SMART data is unchanged since the last download")
+        self._last_updated = datetime.now(timezone.utc)
+        await self.hass.async_add_executor_job(self._touch_cache, self._last_updated)
+        return True
+    
+    def _process_content(self, content: bytes | str) -> tuple[int, dict[str, Any]] | None:
+        """Parse SMART content and build its graph (runs in the executor).
+        
+        Args:
+            content: Raw content from SMART data file
+            
+        Only the record count is kept alongside the graph; the records
+        themselves are released once the graph has been built.
+        
+        Returns:
+            Tuple of (record count, graph), or None if parsing failed
+        """
+        data = self._parse_smart_data(content)
+        if data is None:
+            return None
+        return len(data), self._build_graph(data)
+    
+    @staticmethod
+    def _parse_smart_data(content: bytes | str) -> list[dict[str, Any]] | None:
         """Parse SMART data from JSON or newline-delimited JSON.
         
         Args:
             content: Raw content from SMART data file
             
         Returns:
-            True if parsing succeeded, False otherwise
+            The SMART records, or None if parsing failed
         """
-        self._data = []
+        # Peek at the first significant character to pick the parser, so an
+        # NDJSON file is not run through a failed whole-document parse first
+        first = content[:64].lstrip()[:1]
+        if isinstance(first, bytes):
+            first = first.decode("ascii", "replace")
         
-        try:
-            # Try to parse as JSON array first
-            data = json.loads(content)
+        if first == "[":
+            try:
+                data = json_loads(content)
+            except json.JSONDecodeError as exc:
+                _LOGGER.error("Failed to parse SMART data as JSON array: %s", exc)
+                return None
             if isinstance(data, list):
-                self._data = data
                 _LOGGER.debug("Parsed SMART data as JSON array")
-                return True
-            elif isinstance(data, dict):
-                # Check if this is a wrapper object with BERTHDATA key
-                if "BERTHDATA" in data and isinstance(data["BERTHDATA"], list):
-                    berthdata = data["BERTHDATA"]
-                    # Validate that BERTHDATA is not empty
-                    if not berthdata:
-                        _LOGGER.warning("BERTHDATA array is empty")
-                        return False
-                    self._data = berthdata
-                    _LOGGER.debug("Parsed SMART data from BERTHDATA wrapper (%d records)", len(berthdata))
-                    return True
-                # Single object without BERTHDATA, wrap in list
-                self._data = [data]
-                _LOGGER.debug("Parsed SMART data as single JSON object")
-                return True
-        except json.JSONDecodeError:
-            # Not a JSON array, try newline-delimited JSON
-            _LOGGER.debug("Content is not a JSON array, trying newline-delimited JSON")
-        
-        # Try newline-delimited JSON
+                return data
+        elif first == "{":
+            try:
+                data = json_loads(content)
+            except json.JSONDecodeError:
+                # Several objects, one per line
+                _LOGGER.debug("Content is not a single JSON object, trying newline-delimited JSON")
+            else:
+                if isinstance(data, dict):
+                    # Check if this is a wrapper object with BERTHDATA key
+                    if isinstance(data.get("BERTHDATA"), list):
+                        # Detach the list so the wrapper can be freed straight away
+                        berthdata = data.pop("BERTHDATA")
+                        # Validate that BERTHDATA is not empty
+                        if not berthdata:
+                            _LOGGER.warning("BERTHDATA array is empty")
+                            return None
+                        _LOGGER.debug("Parsed SMART data from BERTHDATA wrapper (%d records)", len(berthdata))
+                        return berthdata
+                    # Single object without BERTHDATA, wrap in list
+                    _LOGGER.debug("Parsed SMART data as single JSON object")
+                    return [data]
+        
+        # Try newline-delimited JSON; the line count bounds the record count,
+        # so the list is sized once and trimmed rather than grown. Bytes are
+        # read a line at a time rather than split into a second copy up front.
+        if isinstance(content, bytes):
+            lines = io.BytesIO(content)
+            line_count = content.count(b"\n") + 1
+        else:
+            lines = content.splitlines()
+            line_count = len(lines)
+        records: list[dict[str, Any]] = [None] * line_count  # type: ignore[list-item]
+        count = 0
         try:
-            for line in content.strip().split('\n'):
+            for line in lines:
                 line = line.strip()
                 if not line:
                     continue
-                obj = json.loads(line)
+                obj = json_loads(line)
                 if isinstance(obj, dict):
-                    self._data.append(obj)
+                    records[count] = obj
+                    count += 1
+            del records[count:]
             
-            if self._data:
+            if records:
                 _LOGGER.debug("Parsed SMART data as newline-delimited JSON")
-                return True
+                return records
         except json.JSONDecodeError as exc:
             _LOGGER.error("Failed to parse SMART data as newline-delimited JSON: %s", exc)
-            return False
+            return None
         
         _LOGGER.error("SMART data is empty or in unrecognized format")
-        return False
+        return None
     
-    def _build_graph(self) -> None:
-        """Build efficient in-memory graph structure for querying."""
-        self._graph = {
-            "berth_to_connections": {},  # berth_key -> {"from": [...], "to": [...]}
-            "stanox_to_berths": {},      # stanox -> [berth_info, ...]
+    @staticmethod
+    def _build_graph(data: list[dict[str, Any]]) -> dict[str, Any]:
+        """Build efficient in-memory graph structure for querying.
+        
+        Args:
+            data: Parsed SMART records
+            
+        Returns:
+            The graph structure
+        """
+        graph: dict[str, Any] = {
+            "berth_to_connections": {},  # berth_key -> {"from": [BerthConnection], "to": [...]}
+            "stanox_to_berths": {},      # stanox -> [StanoxBerth, ...]
             "berth_to_stanox": {},       # berth_key -> stanox
+            "td_area_to_stations": {},   # td_area -> [(stanox, stanme), ...]
+            "berth_neighbors": {},       # berth_key -> (neighbouring berth_key, ...)
         }
         
-        for record in self._data:
-            td_area = record.get("TD", "").strip()
-            from_berth = record.get("FROMBERTH", "").strip()
-            to_berth = record.get("TOBERTH", "").strip()
-            stanox = record.get("STANOX", "").strip()
-            stanme = record.get("STANME", "").strip()
-            steptype = record.get("STEPTYPE", "").strip()
-            event = record.get("EVENT", "").strip()
-            platform = record.get("PLATFORM", "").strip()
-            from_line = record.get("FROMLINE", "").strip()
-            to_line = record.get("TOLINE", "").strip()
+        connections = graph["berth_to_connections"]
+        stanox_to_berths = graph["stanox_to_berths"]
+        berth_to_stanox = graph["berth_to_stanox"]
+        td_area_to_stations = graph["td_area_to_stations"]
+        
+        # Codes repeat across many records, so intern them to keep one copy each
+        intern = sys.intern
+        
+        for record in data:
+            try:
+                (td_area, from_berth, to_berth, stanox, steptype,
+                 from_line, to_line, stanme, platform, event) = _get_smart_fields(record)
+            except KeyError:
+                # Records missing a field fall back to per-key lookups
+                (td_area, from_berth, to_berth, stanox, steptype,
+                 from_line, to_line, stanme, platform, event) = map(record.get, _SMART_FIELDS)
+            
+            td_area = intern((td_area or "").strip())
+            from_berth = intern((from_berth or "").strip())
+            to_berth = intern((to_berth or "").strip())
+            stanox = intern((stanox or "").strip())
+            steptype = intern((steptype or "").strip())
+            
+            # Berth keys are shared by the connection and STANOX mappings
+            from_key = intern(f"{td_area}:{from_berth}") if td_area and from_berth else None
+            to_key = intern(f"{td_area}:{to_berth}") if td_area and to_berth else None
             
             # Build berth connections
-            if td_area and from_berth and to_berth:
-                from_key = f"{td_area}:{from_berth}"
-                to_key = f"{td_area}:{to_berth}"
-                
+            if from_key and to_key:
                 # Add "to" connection for from_berth
-                if from_key not in self._graph["berth_to_connections"]:
-                    self._graph["berth_to_connections"][from_key] = {"from": [], "to": []}
-                self._graph["berth_to_connections"][from_key]["to"].append({
-                    "berth": to_berth,
-                    "td_area": td_area,
-                    "line": to_line,
-                    "steptype": steptype,
-                })
+                from_conns = connections.get(from_key)
+                if from_conns is None:
+                    from_conns = connections[from_key] = {"from": [], "to": []}
+                from_conns["to"].append(BerthConnection(
+                    to_berth, td_area, intern((to_line or "").strip()), steptype
+                ))
                 
                 # Add "from" connection for to_berth
-                if to_key not in self._graph["berth_to_connections"]:
-                    self._graph["berth_to_connections"][to_key] = {"from": [], "to": []}
-                self._graph["berth_to_connections"][to_key]["from"].append({
-                    "berth": from_berth,
-                    "td_area": td_area,
-                    "line": from_line,
-                    "steptype": steptype,
-                })
+                to_conns = connections.get(to_key)
+                if to_conns is None:
+                    to_conns = connections[to_key] = {"from": [], "to": []}
+                to_conns["from"].append(BerthConnection(
+                    from_berth, td_area, intern((from_line or "").strip()), steptype
+                ))
             
             # Build STANOX to berths mapping
             if stanox:
-                if stanox not in self._graph["stanox_to_berths"]:
-                    self._graph["stanox_to_berths"][stanox] = []
+                stanme = intern((stanme or "").strip())
                 
                 # Add berth info for this STANOX
-                berth_info = {
-                    "td_area": td_area,
-                    "from_berth": from_berth,
-                    "to_berth": to_berth,
-                    "stanme": stanme,
-                    "platform": platform,
-                    "event": event,
-                    "steptype": steptype,
-                }
-                self._graph["stanox_to_berths"][stanox].append(berth_info)
+                stanox_berths = stanox_to_berths.get(stanox)
+                if stanox_berths is None:
+                    stanox_berths = stanox_to_berths[stanox] = []
+                stanox_berths.append(StanoxBerth(
+                    td_area,
+                    from_berth,
+                    to_berth,
+                    stanme,
+                    intern((platform or "").strip()),
+                    intern((event or "").strip()),
+                    steptype,
+                ))
                 
                 # Build reverse mapping (berth -> STANOX)
-                if from_berth and td_area:
-                    berth_key = f"{td_area}:{from_berth}"
-                    self._graph["berth_to_stanox"][berth_key] = stanox
-                if to_berth and td_area:
-                    berth_key = f"{td_area}:{to_berth}"
-                    self._graph["berth_to_stanox"][berth_key] = stanox
+                if from_key:
+                    berth_to_stanox[from_key] = stanox
+                if to_key:
+                    berth_to_stanox[to_key] = stanox
+                
+                # Build reverse mapping (TD area -> stations) for area sensors;
+                # collected as sets so repeats cost a hash lookup, not a scan
+                if td_area and stanme:
+                    area_stations = td_area_to_stations.get(td_area)
+                    if area_stations is None:
+                        area_stations = td_area_to_stations[td_area] = set()
+                    area_stations.add((stanox, stanme))
+        
+        # Keep each area's stations ordered by STANOX so readers can take the first
+        for td_area, area_stations in td_area_to_stations.items():
+            td_area_to_stations[td_area] = sorted(area_stations)
+        
+        # Direction-free adjacency for the multi-hop station search
+        graph["berth_neighbors"] = build_berth_neighbors(connections)
         
         _LOGGER.debug(
             "Built SMART graph: %d berth connections, %d STANOX entries",
-            len(self._graph["berth_to_connections"]),
-            len(self._graph["stanox_to_berths"])
+            len(graph["berth_to_connections"]),
+            len(graph["stanox_to_berths"])
         )
+        return graph
     
     async def _load_from_cache(self) -> bool:
         """Load SMART data from cache file.
         
+        The cache is read, parsed and turned into the graph in the executor;
+        the results are only applied here, on the event loop.
+        
         Returns:
             True if cache is valid and loaded, False otherwise
         """
-        if not self.cache_path.exists():
-            _LOGGER.debug("SMART cache file does not exist: %s", self.cache_path)
+        result = await self.hass.async_add_executor_job(self._read_cache)
+        if result is None:
             return False
+        self._record_count, self._graph, self._last_updated = result
+        self._etag = await self.hass.async_add_executor_job(self._read_etag)
+        return True
+    
+    def _read_cache(
+        self,
+    ) -> tuple[int, dict[str, Any], datetime | None] | None:
+        """Read SMART data from the cache file (runs in the executor).
+        
+        The cache is the gzipped SMART payload, and its modification time is
+        when the data was last confirmed current. A cache in the older JSON
+        wrapper format is still read once and then rewritten in the current
+        format.
+        
+        Returns:
+            Tuple of (record count, graph, last updated), or None if no valid cache
+        """
+        # One stat gives existence, size and age
+        try:
+            stat = os.stat(self.cache_path)
+        except FileNotFoundError:
+            if self.legacy_cache_path.exists():
+                return self._read_legacy_cache()
+            _LOGGER.debug("SMART cache file does not exist: %s", self.cache_path)
+            return None
+        except OSError as exc:
+            _LOGGER.warning("Failed to load SMART data from cache: %s", exc)
+            return None
+        
+        if not stat.st_size:
+            _LOGGER.warning("SMART cache file is empty: %s", self.cache_path)
+            return None
         
         try:
             # Check cache age
-            mtime = os.path.getmtime(self.cache_path)
-            cache_age = datetime.now(timezone.utc) - datetime.fromtimestamp(mtime, timezone.utc)
+            mtime = stat.st_mtime
+            cache_age = time.time() - mtime
             
-            if cache_age > timedelta(days=SMART_CACHE_EXPIRY_DAYS):
-                _LOGGER.debug("SMART cache is expired (age: %s)", cache_age)
-                return False
+            if cache_age > _CACHE_EXPIRY_SECONDS:
+                _LOGGER.debug("SMART cache is expired (age: %.1f days)", cache_age / 86400)
+                return None
+            
+            # Load and parse cache
+            with _gzip.open(self.cache_path, "rb") as f:
+                content = f.read()
+            
+            result = self._process_content(content)
+            if result is None:
+                _LOGGER.warning("Failed to parse cached SMART data")
+                return None
+            
+            _LOGGER.debug("Loaded SMART data from cache (age: %.1f days)", cache_age / 86400)
+            return (*result, datetime.fromtimestamp(mtime, timezone.utc))
+            
+        except (OSError, EOFError, _zlib.error) as exc:
+            _LOGGER.warning("Failed to load SMART data from cache: %s", exc)
+            return None
+    
+    def _read_legacy_cache(
+        self,
+    ) -> tuple[int, dict[str, Any], datetime | None] | None:
+        """Read SMART data from a cache in the older JSON wrapper format.
+        
+        On success the data is saved in the current format and the legacy
+        file is removed.
+        
+        Returns:
+            Tuple of (record count, graph, last updated), or None if no valid cache
+        """
+        try:
+            # Check cache age
+            mtime = os.path.getmtime(self.legacy_cache_path)
+            cache_age = time.time() - mtime
+            
+            if cache_age > _CACHE_EXPIRY_SECONDS:
+                _LOGGER.debug("Legacy SMART cache is expired (age: %.1f days)", cache_age / 86400)
+                return None
             
             # Load and parse cache
-            with open(self.cache_path, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
+            with open(self.legacy_cache_path, "rb") as f:
+                cache_data = json_loads(f.read())
+            if not isinstance(cache_data, dict):
+                _LOGGER.warning("Legacy SMART cache is not a JSON object")
+                return None
             
+            last_updated = None
             timestamp_str = cache_data.get("timestamp")
             if timestamp_str:
-                self._last_updated = datetime.fromisoformat(timestamp_str)
+                last_updated = datetime.fromisoformat(timestamp_str)
             
             content = cache_data.get("content", "")
-            if not content:
+            if not content or not isinstance(content, str):
                 _LOGGER.warning("SMART cache file is missing content")
-                return False
+                return None
             
             # Check if content is double-encoded (JSON string within JSON)
             # If content is a string that looks like JSON, try to parse it again
-            if isinstance(content, str):
-                try:
-                    # Try to parse it as JSON - if it works, we had double-encoding
-                    parsed_content = json.loads(content)
-                    if isinstance(parsed_content, (dict, list)):
-                        _LOGGER.debug("Content was double-encoded JSON string, decoded successfully")
-                        content = json.dumps(parsed_content)  # Convert back to string for _parse_smart_data
-                except json.JSONDecodeError:
-                    # Not double-encoded, content is already the right format
-                    pass
+            try:
+                # Try to parse it as JSON - if it works, we had double-encoding
+                parsed_content = json_loads(content)
+                if isinstance(parsed_content, (dict, list)):
+                    _LOGGER.debug("Content was double-encoded JSON string, decoded successfully")
+                    content = json.dumps(parsed_content)  # Convert back to string for _parse_smart_data
+            except json.JSONDecodeError:
+                # Not double-encoded, content is already the right format
+                pass
             
             # Parse the cached content
-            if not self._parse_smart_data(content):
+            content = content.encode("utf-8")
+            result = self._process_content(content)
+            if result is None:
                 _LOGGER.warning("Failed to parse cached SMART data")
-                return False
+                return None
             
-            # Build the graph
-            self._build_graph()
+            # Migrate to the current cache format
+            self._save_to_cache(content, last_updated)
+            if self.cache_path.exists():
+                self.legacy_cache_path.unlink(missing_ok=True)
             
-            _LOGGER.debug("Loaded SMART data from cache (age: %s)", cache_age)
-            return True
+            _LOGGER.debug("Loaded SMART data from legacy cache (age: %.1f days)", cache_age / 86400)
+            return (*result, last_updated)
             
-        except Exception as exc:
-            _LOGGER.warning("Failed to load SMART data from cache: %s", exc)
-            return False
+        except (OSError, ValueError) as exc:
+            _LOGGER.warning("Failed to load SMART data from legacy cache: %s", exc)
+            return None
     
-    async def _save_to_cache(self, content: str) -> None:
-        """Save SMART data to cache file.
+    def _save_to_cache(
+        self,
+        content: bytes,
+        last_updated: datetime | None,
+        etag: str | None = None,
+    ) -> None:
+        """Save SMART data to cache file (runs in the executor).
         
         Args:
             content: Raw SMART data content to cache
+            last_updated: When the data was downloaded, kept as the file's mtime
+            etag: ETag the content was served with, if known
         """
+        tmp_path = self.cache_path.with_suffix(".tmp")
         try:
             # Ensure directory exists
             self.cache_path.parent.mkdir(parents=True, exist_ok=True)
             
-            cache_data = {
-                "timestamp": self._last_updated.isoformat() if self._last_updated else None,
-                "content": content,
-            }
+            # Write to a temporary file and swap it in, so a crash part way
+            # through never leaves a truncated cache behind
+            with open(tmp_path, "wb") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                    f.write(content)
+                raw.flush()
+                os.fsync(raw.fileno())
             
-            with open(self.cache_path, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f)
+            # The file's modification time records when the data was downloaded
+            if last_updated:
+                timestamp = last_updated.timestamp()
+                os.utime(tmp_path, (timestamp, timestamp))
+            
+            # An ETag from an older payload must not survive the new content
+            self.etag_path.unlink(missing_ok=True)
+            os.replace(tmp_path, self.cache_path)
+            if etag:
+                self.etag_path.write_text(etag, encoding="utf-8")
             
             _LOGGER.debug("Saved SMART data to cache: %s", self.cache_path)
             
-        except Exception as exc:
+        except OSError as exc:
             _LOGGER.error("Failed to save SMART data to cache: %s", exc)
+            tmp_path.unlink(missing_ok=True)
+    
+    def _touch_cache(self, last_updated: datetime) -> None:
+        """Mark the cached SMART data as current (runs in the executor).
+        
+        Args:
+            last_updated: When the data was confirmed unchanged
+        """
+        try:
+            timestamp = last_updated.timestamp()
+            os.utime(self.cache_path, (timestamp, timestamp))
+        except OSError as exc:
+            _LOGGER.warning("Failed to update SMART cache timestamp: %s", exc)
+    
+    def _read_etag(self) -> str | None:
+        """Read the ETag of the cached payload (runs in the executor).
+        
+        Returns:
+            The stored ETag, or None if there is none
+        """
+        try:
+            return self.etag_path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
     
     def get_graph(self) -> dict[str, Any]:
         """Get the parsed SMART graph structure.
@@ -426,6 +736,14 @@ class SmartDataManager:
         """
         return self._graph
     
+    def get_record_count(self) -> int:
+        """Get the number of SMART records the graph was built from.
+        
+        Returns:
+            Number of records, or 0 if no data is loaded
+        """
+        return self._record_count
+    
     def get_last_updated(self) -> datetime | None:
         """Get the timestamp when SMART data was last updated.
         
@@ -440,4 +758,4 @@ class SmartDataManager:
         Returns:
             True if data is loaded, False otherwise
         """
-        return len(self._data) > 0
+        return self._record_count > 0
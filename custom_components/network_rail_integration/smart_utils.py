@@ -3,12 +3,28 @@
 from __future__ import annotations
 
 import logging
+import sys
 from collections import deque
 from typing import Any
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def split_berth_key(berth_key: str) -> tuple[str, str] | None:
+    """Split an "area:berth" key into its TD area and berth ID.
+    
+    Args:
+        berth_key: Berth key as stored in the SMART graph (e.g., "SK:3647")
+        
+    Returns:
+        Tuple of (td_area, berth_id), or None if the key has no separator
+    """
+    td_area, sep, berth_id = berth_key.partition(":")
+    if not sep:
+        return None
+    return td_area, berth_id
+
+
 def get_adjacent_berths(
     graph: dict[str, Any], 
     berth_id: str, 
@@ -22,7 +38,8 @@ def get_adjacent_berths(
         td_area: TD area code (e.g., "SK")
         
     Returns:
-        Dictionary with "from" and "to" lists of connected berths:
+        Dictionary with "from" and "to" lists of connected berths
+        (BerthConnection records, which also support .get()):
         {
             "from": [{"berth": "3647", "line": "UP", "steptype": "B"}, ...],
             "to": [{"berth": "3649", "line": "DOWN", "steptype": "B"}, ...]
@@ -49,7 +66,7 @@ def get_berths_for_stanox(
         stanox: STANOX code (e.g., "32000")
         
     Returns:
-        List of dictionaries with berth information:
+        List of berth records (StanoxBerth, which also support .get()):
         [
             {
                 "td_area": "SK",
@@ -67,6 +84,36 @@ def get_berths_for_stanox(
     return stanox_to_berths.get(stanox, [])
 
 
+def build_berth_neighbors(
+    berth_to_connections: dict[str, dict[str, list[Any]]]
+) -> dict[str, tuple[str, ...]]:
+    """Build an undirected berth adjacency index from the SMART connections.
+    
+    Neighbour keys are formatted once here, so searches that ignore the
+    direction of travel can look them up instead of rebuilding
+    "area:berth" strings for every edge they follow.
+    
+    Args:
+        berth_to_connections: Berth connection mapping from the SMART graph
+        
+    Returns:
+        Dictionary mapping berth_key -> neighbouring berth keys, "from"
+        connections first, then "to", without repeats
+    """
+    intern = sys.intern
+    neighbors: dict[str, tuple[str, ...]] = {}
+    for berth_key, connections in berth_to_connections.items():
+        keys = [
+            intern(f"{conn.get('td_area', '')}:{conn.get('berth', '')}")
+            for direction in ("from", "to")
+            for conn in connections.get(direction, [])
+            if conn.get("td_area", "") and conn.get("berth", "")
+        ]
+        if keys:
+            neighbors[berth_key] = tuple(dict.fromkeys(keys))
+    return neighbors
+
+
 def find_adjacent_stations_multihop(
     graph: dict[str, Any],
     center_berth_keys: set[str],
@@ -78,58 +125,43 @@ def find_adjacent_stations_multihop(
     Returns:  
         Dictionary mapping stanox -> hop_distance
     """
-    from collections import deque
-    
-    berth_to_connections = graph. get("berth_to_connections", {})
     berth_to_stanox = graph.get("berth_to_stanox", {})
+    berth_neighbors = graph.get("berth_neighbors")
+    if berth_neighbors is None:
+        berth_neighbors = build_berth_neighbors(graph.get("berth_to_connections", {}))
     
     adjacent_stations = {}  # stanox -> distance
-    visited_berths = set()
-    queue = deque()
     
     # Initialize with center berths at distance 0
-    for berth_key in center_berth_keys:
-        queue.append((berth_key, 0))
-        visited_berths.add(berth_key)
+    visited_berths = set(center_berth_keys)
+    frontier = list(center_berth_keys)
     
     _LOGGER.debug("Multi-hop:  Starting from %d center berths", len(center_berth_keys))
     
     hop_counts = {0: len(center_berth_keys)}
     
-    while queue: 
-        current_berth, distance = queue.popleft()
-        
-        # Stop if we've gone too far
-        if distance >= max_hops:
-            continue
-        
-        connections = berth_to_connections. get(current_berth, {})
-        
-        # Check both "from" and "to" connections
-        for direction in ["from", "to"]:  
-            for conn in connections. get(direction, []):
-                conn_td_area = conn.get("td_area", "")
-                conn_berth = conn.get("berth", "")
-                
-                if not conn_td_area or not conn_berth:
-                    continue
-                
-                conn_key = f"{conn_td_area}:{conn_berth}"
+    # Expand one hop at a time, so every berth in the frontier shares a distance
+    for distance in range(1, max_hops + 1):
+        next_frontier = []
+        for current_berth in frontier:
+            for conn_key in berth_neighbors.get(current_berth, ()):
                 conn_stanox = berth_to_stanox.get(conn_key)
                 
-                # Found a station (not the center)
-                if conn_stanox and conn_stanox != center_stanox:
-                    # Record this station if not seen or closer
-                    if conn_stanox not in adjacent_stations or distance + 1 < adjacent_stations[conn_stanox]: 
-                        adjacent_stations[conn_stanox] = distance + 1
+                # Found a station (not the center); the first sighting is the closest
+                if conn_stanox and conn_stanox != center_stanox and conn_stanox not in adjacent_stations:
+                    adjacent_stations[conn_stanox] = distance
                 
                 # Continue exploring from this berth
                 if conn_key not in visited_berths:
                     visited_berths.add(conn_key)
-                    queue.append((conn_key, distance + 1))
-                    hop_counts[distance + 1] = hop_counts.get(distance + 1, 0) + 1
+                    next_frontier.append(conn_key)
+        
+        if not next_frontier:
+            break
+        hop_counts[distance] = len(next_frontier)
+        frontier = next_frontier
     
-    _LOGGER. debug("Multi-hop:  Visited %d berths across hops:  %s", len(visited_berths), hop_counts)
+    _LOGGER.debug("Multi-hop:  Visited %d berths across hops:  %s", len(visited_berths), hop_counts)
     
     return adjacent_stations
 
@@ -207,11 +239,6 @@ def get_station_berths_with_connections(
     _LOGGER.info("Starting multi-hop discovery (max %d hops)...", max_hops)
     adjacent_stations = find_adjacent_stations_multihop(graph, berth_keys, stanox, max_hops=max_hops)
     
-    
-    # Use multi-hop discovery to find adjacent stations
-    _LOGGER.info("Starting multi-hop discovery (max %d hops)...", max_hops)
-    adjacent_stations = find_adjacent_stations_multihop(graph, berth_keys, stanox, max_hops=max_hops)
-    
     _LOGGER.info("Found %d adjacent stations via connections", len(adjacent_stations))
     
     # FALLBACK: If we found fewer than expected stations, try berth proximity search
@@ -538,6 +565,9 @@ def get_berth_route(
 ) -> list[dict[str, str]]:
     """Find berth sequence between two stations using breadth-first search.
     
+    The search runs from both stations at once and stops where the two
+    sides meet, so it visits far fewer berths than a one-sided search.
+    
     Args:
         graph: SMART graph structure from SmartDataManager
         from_stanox: Starting STANOX code
@@ -570,73 +600,87 @@ def get_berth_route(
         _LOGGER.warning("No berths found for destination STANOX: %s", to_stanox)
         return []
     
-    # Build set of destination berth keys
-    dest_berth_keys = set()
-    for record in to_berth_records:
-        td_area = record.get("td_area", "")
-        from_berth = record.get("from_berth", "")
-        to_berth = record.get("to_berth", "")
-        if from_berth and td_area:
-            dest_berth_keys.add(f"{td_area}:{from_berth}")
-        if to_berth and td_area:
-            dest_berth_keys.add(f"{td_area}:{to_berth}")
-    
-    # BFS to find shortest path
-    queue = deque()
-    visited = set()
-    
-    # Initialize queue with starting berths
-    for record in from_berth_records:
-        td_area = record.get("td_area", "")
-        from_berth = record.get("from_berth", "")
-        to_berth = record.get("to_berth", "")
-        
-        if from_berth and td_area:
-            berth_key = f"{td_area}:{from_berth}"
-            queue.append((berth_key, [berth_key]))
-            visited.add(berth_key)
-        
-        if to_berth and td_area:
-            berth_key = f"{td_area}:{to_berth}"
-            if berth_key not in visited:
-                queue.append((berth_key, [berth_key]))
-                visited.add(berth_key)
-    
-    # BFS search
-    while queue:
-        current_key, path = queue.popleft()
-        
-        # Check if we've reached the destination
-        if current_key in dest_berth_keys:
-            # Build result with berth info
-            result = []
-            for berth_key in path:
-                parts = berth_key.split(":", 1)
-                if len(parts) == 2:
-                    td_area, berth_id = parts
-                    result.append({
-                        "berth_id": berth_id,
-                        "td_area": td_area,
-                        "stanox": berth_to_stanox.get(berth_key),
-                    })
-            return result
-        
-        # Check max hops
-        if len(path) >= max_hops:
-            continue
-        
-        # Explore neighbors
-        connections = berth_to_connections.get(current_key, {})
+    # Starting and destination berths are the BFS roots on each side; the
+    # parent maps double as visited sets (roots map to None)
+    parent_f: dict[str, str | None] = {}
+    parent_b: dict[str, str | None] = {}
+    for records, parents in ((from_berth_records, parent_f), (to_berth_records, parent_b)):
+        for record in records:
+            td_area = record.get("td_area", "")
+            if not td_area:
+                continue
+            for berth in (record.get("from_berth", ""), record.get("to_berth", "")):
+                if berth:
+                    parents.setdefault(f"{td_area}:{berth}", None)
+    
+    # A starting berth may already be a destination berth
+    meeting = next((key for key in parent_f if key in parent_b), None)
+    
+    # Bidirectional BFS: grow the smaller frontier one level at a time,
+    # forwards along "to" connections from the start and backwards along
+    # "from" connections from the destination, until the two meet. Paths
+    # may hold at most max_hops berths, i.e. max_hops - 1 steps.
+    frontier_f = list(parent_f)
+    frontier_b = list(parent_b)
+    steps = 0
+    while meeting is None and frontier_f and frontier_b and steps + 1 < max_hops:
+        if len(frontier_f) <= len(frontier_b):
+            frontier, parents, others, direction = frontier_f, parent_f, parent_b, "to"
+        else:
+            frontier, parents, others, direction = frontier_b, parent_b, parent_f, "from"
         
-        # Try "to" connections (forward direction)
-        for conn in connections.get("to", []):
-            conn_td_area = conn.get("td_area", "")
-            conn_berth = conn.get("berth", "")
-            if conn_td_area and conn_berth:
+        next_frontier = []
+        for current_key in frontier:
+            connections = berth_to_connections.get(current_key)
+            if not connections:
+                continue
+            for conn in connections.get(direction, []):
+                conn_td_area = conn.get("td_area", "")
+                conn_berth = conn.get("berth", "")
+                if not (conn_td_area and conn_berth):
+                    continue
                 next_key = f"{conn_td_area}:{conn_berth}"
-                if next_key not in visited:
-                    visited.add(next_key)
-                    queue.append((next_key, path + [next_key]))
+                if next_key in parents:
+                    continue
+                parents[next_key] = current_key
+                if next_key in others:
+                    meeting = next_key
+                    break
+                next_frontier.append(next_key)
+            if meeting is not None:
+                break
+        
+        if parents is parent_f:
+            frontier_f = next_frontier
+        else:
+            frontier_b = next_frontier
+        steps += 1
+    
+    if meeting is not None:
+        # Walk the parent pointers back to a starting berth and on to a
+        # destination berth, then describe each berth on the route
+        path: list[str] = []
+        key: str | None = meeting
+        while key is not None:
+            path.append(key)
+            key = parent_f[key]
+        path.reverse()
+        key = parent_b[meeting]
+        while key is not None:
+            path.append(key)
+            key = parent_b[key]
+        
+        result = []
+        for berth_key in path:
+            parts = split_berth_key(berth_key)
+            if parts is not None:
+                td_area, berth_id = parts
+                result.append({
+                    "berth_id": berth_id,
+                    "td_area": td_area,
+                    "stanox": berth_to_stanox.get(berth_key),
+                })
+        return result
     
     # No path found
     _LOGGER.debug("No berth route found from %s to %s within %d hops", from_stanox, to_stanox, max_hops)
@@ -875,8 +919,8 @@ def get_sequential_berths(
         current_berth_key = queue.popleft()
         
         # Parse berth key
-        parts = current_berth_key.split(":", 1)
-        if len(parts) != 2:
+        parts = split_berth_key(current_berth_key)
+        if parts is None:
             continue
         
         td_area, berth_id = parts
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import csv
+from functools import lru_cache
 import logging
 from pathlib import Path
 from typing import Any
@@ -140,6 +141,7 @@ async def search_stanox(query: str, limit: int = 100) -> list[dict[str, str]]:
     return results
 
 
+@lru_cache(maxsize=4096)
 def format_station_name(raw_name: str | None) -> str | None:
     """Format a station name from the STANOX CSV to be more human-readable.
     
@@ -147,6 +149,9 @@ def format_station_name(raw_name: str | None) -> str | None:
     manual overrides for accurate formatting (e.g., "CANTBURYW" → "Canterbury West").
     Other stations use pattern matching for suffixes like JN (Junction), RD (Road), etc.
     
+    Results are memoized, as the same station names are formatted repeatedly
+    when sensors are created.
+    
     Args:
         raw_name: The raw station name from the CSV (usually uppercase)
         
@@ -4,8 +4,11 @@ from __future__ import annotations
 
 import logging
 from collections import deque
+from collections.abc import KeysView
 from typing import Any
 
+from .movement_builder import ms_to_local_iso
+
 _LOGGER = logging.getLogger(__name__)
 
 # C-Class message types (berth operations)
@@ -91,8 +94,6 @@ def parse_td_message(message: dict[str, Any]) -> dict[str, Any] | None:
             _LOGGER.debug("parse_td_message: unknown msg_type '%s' in key '%s'", msg_type, key)
             continue
         
-        _LOGGER.debug("parse_td_message: found TD message type=%s, area=%s", msg_type, content.get("area_id"))
-        
         # Extract common fields
         parsed = {
             "msg_type": msg_type,
@@ -137,7 +138,8 @@ def parse_td_message(message: dict[str, Any]) -> dict[str, Any] | None:
         
         return parsed
     
-    _LOGGER.debug("parse_td_message: no TD message found in keys: %s", list(message.keys()))
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("parse_td_message: no TD message found in keys: %s", list(message.keys()))
     return None
 
 
@@ -184,10 +186,19 @@ class BerthState:
             event_history_size: Maximum number of events to keep in history (1-50)
         """
         self._berths: dict[str, dict[str, str]] = {}  # berth_id -> {description, timestamp}
+        self._area_berth_counts: dict[str, int] = {}  # area_id -> occupied berth count
         self._event_history_size = self._validate_history_size(event_history_size)
         self._event_history: deque[dict[str, Any]] = deque(maxlen=self._event_history_size)
+        # Same events in sensor-attribute form, formatted once when recorded
+        self._formatted_history: deque[dict[str, Any]] = deque(maxlen=self._event_history_size)
         self._platform_state: dict[str, dict[str, Any]] = {}  # platform_id -> {current_train, current_event, etc.}
         self._berth_to_platform: dict[str, str] = {}  # berth_key -> platform_id mapping
+        self._version = 0  # Bumped on every mutation so readers can cache derived data
+    
+    @property
+    def version(self) -> int:
+        """Return a counter that changes whenever the berth state is mutated."""
+        return self._version
     
     @staticmethod
     def _validate_history_size(size: int) -> int:
@@ -208,6 +219,7 @@ class BerthState:
             mapping: Dictionary mapping berth keys (area:berth) to platform IDs
         """
         self._berth_to_platform = mapping.copy()
+        self._version += 1
     
     def set_event_history_size(self, size: int) -> None:
         """Update the event history size.
@@ -221,7 +233,42 @@ class BerthState:
             # Create new deque with new size and copy old events
             old_events = list(self._event_history)
             self._event_history = deque(old_events[-new_size:], maxlen=new_size)
+            self._formatted_history = deque(self._formatted_history, maxlen=new_size)
+            self._version += 1
     
+    @staticmethod
+    def _format_event(event: dict[str, Any]) -> dict[str, Any]:
+        """Convert an event record into the form exposed as sensor attributes."""
+        timestamp = event.get("timestamp")
+        event_dict = {
+            "event_type": event.get("event_type"),
+            "train_id": event.get("train_id"),
+            "timestamp": ms_to_local_iso(timestamp) if timestamp else None,
+            "area_id": event.get("area_id"),
+        }
+        # Optional platform and berth information
+        for key in ("platform", "from_platform", "to_platform", "from_berth", "to_berth"):
+            if key in event:
+                event_dict[key] = event[key]
+        return event_dict
+
+    def _set_berth(self, area_id: str, berth_key: str, state: dict[str, str]) -> None:
+        """Occupy a berth, keeping the per-area counters in step."""
+        if berth_key not in self._berths:
+            self._area_berth_counts[area_id] = self._area_berth_counts.get(area_id, 0) + 1
+        self._berths[berth_key] = state
+
+    def _clear_berth(self, berth_key: str) -> None:
+        """Clear a berth if occupied, keeping the per-area counters in step."""
+        if self._berths.pop(berth_key, None) is None:
+            return
+        area_id = berth_key.partition(":")[0]
+        remaining = self._area_berth_counts.get(area_id, 0) - 1
+        if remaining > 0:
+            self._area_berth_counts[area_id] = remaining
+        else:
+            self._area_berth_counts.pop(area_id, None)
+
     def _update_platform_idle(self, platform_id: str, timestamp: Any) -> None:
         """Update platform state to idle.
         
@@ -270,7 +317,7 @@ class BerthState:
             # Remove oldest entries to get back under limit
             num_to_remove = len(self._berths) - self.MAX_BERTHS
             for berth_key, _ in sorted_berths[:num_to_remove]:
-                self._berths.pop(berth_key, None)
+                self._clear_berth(berth_key)
             
             _LOGGER.debug(
                 "Cleaned up %d old berths (limit: %d)",
@@ -341,16 +388,16 @@ class BerthState:
                 event_record["to_platform"] = to_platform
             
             # Clear from berth
-            self._berths.pop(from_berth, None)
+            self._clear_berth(from_berth)
             
             # Update platform state for departure
             self._update_platform_idle(from_platform, time)
             
             # Set to berth
-            self._berths[to_berth] = {
+            self._set_berth(area_id, to_berth, {
                 "description": description,
                 "timestamp": time,
-            }
+            })
             
             # Update platform state for arrival
             self._update_platform_active(to_platform, description, "arrive", time)
@@ -372,7 +419,7 @@ class BerthState:
             if from_platform:
                 event_record["platform"] = from_platform
             
-            self._berths.pop(from_berth, None)
+            self._clear_berth(from_berth)
             
             # Update platform state
             self._update_platform_idle(from_platform, time)
@@ -394,10 +441,10 @@ class BerthState:
             if to_platform:
                 event_record["platform"] = to_platform
             
-            self._berths[to_berth] = {
+            self._set_berth(area_id, to_berth, {
                 "description": description,
                 "timestamp": time,
-            }
+            })
             
             # Update platform state
             self._update_platform_active(to_platform, description, "interpose", time)
@@ -405,6 +452,8 @@ class BerthState:
         # Add event to history (only for berth operations, not heartbeats)
         if msg_type in (TD_MSG_CA, TD_MSG_CB, TD_MSG_CC):
             self._event_history.append(event_record)
+            self._formatted_history.append(self._format_event(event_record))
+            self._version += 1
         
         # Periodic cleanup to prevent unbounded memory growth
         # Check every 100 updates (amortized cost)
@@ -434,6 +483,30 @@ class BerthState:
         """
         return self._berths.copy()
     
+    def occupied_keys(self) -> KeysView[str]:
+        """Get a live view of the occupied berth keys (area:berth).
+        
+        Returns:
+            Keys view supporting set operations without copying berth state
+        """
+        return self._berths.keys()
+
+    @property
+    def berth_count(self) -> int:
+        """Number of occupied berths across all areas."""
+        return len(self._berths)
+
+    def area_berth_count(self, area_id: str) -> int:
+        """Get the number of occupied berths in a TD area.
+        
+        Args:
+            area_id: TD area ID (e.g., "SK")
+            
+        Returns:
+            Occupied berth count, without copying any berth state
+        """
+        return self._area_berth_counts.get(area_id, 0)
+    
     def get_area_berths(self, area_id: str) -> dict[str, dict[str, str]]:
         """Get all berths in a specific TD area.
         
@@ -477,6 +550,14 @@ class BerthState:
         """
         return list(self._event_history)
     
+    def get_formatted_event_history(self) -> list[dict[str, Any]]:
+        """Get recent event history formatted for sensor attributes.
+        
+        Returns:
+            List of event dictionaries with local ISO timestamps, most recent last
+        """
+        return list(self._formatted_history)
+    
     def get_event_history_size(self) -> int:
         """Get the configured event history size.
         
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 # Mapping of TOC numeric codes to company names
 # Based on Network Rail reference data
 TOC_CODES = {
@@ -48,6 +50,7 @@ LINE_CODES = {
 }
 
 
+@lru_cache(maxsize=512)
 def get_toc_name(toc_id: str | None) -> str:
     """Get the train operating company name from TOC ID.
     
@@ -64,6 +67,7 @@ def get_toc_name(toc_id: str | None) -> str:
     return TOC_CODES.get(toc_str, f"Operator {toc_str}")
 
 
+@lru_cache(maxsize=512)
 def get_direction_description(direction_ind: str | None) -> str:
     """Get a human-readable description of the direction indicator.
     
@@ -80,6 +84,7 @@ def get_direction_description(direction_ind: str | None) -> str:
     return DIRECTION_CODES.get(dir_str, dir_str)
 
 
+@lru_cache(maxsize=512)
 def get_line_description(line_ind: str | None) -> str:
     """Get a human-readable description of the line indicator.
     